@@ -1,181 +1,643 @@
 import pandas as pd
-import shutil
-from openpyxl import load_workbook
+import numpy as np
 import warnings
 import re
 import argparse
 import sys
-import math
+import io
+import os
+import time
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 
 # Import the PriceStockUpdater
-from price_stock_updater import PriceStockUpdater
+from price_stock_updater import PRICE_SOURCES, PriceStockUpdater
+from price_watcher import DEFAULT_POLL_SECONDS, DEFAULT_SETTLE_SECONDS, PriceFileWatcher
+from category_assigner import CategoryAssigner
+from faire_ingest import read_faire_catalog, read_faire_products
+from pricing_engine import PricingEngine
+from sku_matching import SkuMatcher, derive_contribution_goods
+from template_schema import TemplateSchema
+from template_pool import TemplatePool
+from xlsx_writer import RowBuffer, TemplateXmlWriter
+
+# Output engines for the listing files: openpyxl object model or direct XML patching
+OUTPUT_ENGINES = ('openpyxl', 'xml')
 
 # Suppress openpyxl warnings
 warnings.filterwarnings('ignore', category=UserWarning, module='openpyxl')
 
 # ============================================================================
-# CATEGORY ASSIGNER CLASS
+# DEFAULT VALUES FOR MISSING DATA
+# ============================================================================
+# Default values to use when Faire data is missing for specific columns
+
+DEFAULT_VALUES = {
+    'Weight - lb': 0.88,
+    'Length - in': 3.15,
+    'Width - in': 3.15,
+    'Height - in': 3.15
+}
+
+# ============================================================================
+# COLUMN MAPPING DICTIONARY
 # ============================================================================
+# Configure your column mappings here:
+# Key: Faire column name (from faire_products.xlsx)
+# Value: Temu column name (from temu_template.xlsx)
 
-class CategoryAssigner:
-    """Enhanced category assignment system"""
+COLUMN_MAPPINGS = {
+    # Basic product information
+    'Product Name (English)': 'Product Name',
+    'Description (English)': 'Product Description',
+    'SKU': 'Contribution SKU',
+    # Note: USD Unit Retail Price is now used for pricing strategy calculation
+    # 'USD Unit Retail Price': 'Base Price - USD',  # REMOVED - handled by pricing strategy
+    'On Hand Inventory': 'Quantity',
+    'Made In Country': 'Country/Region of Origin',
     
-    def __init__(self):
-        self.category_rules = {
-            
-            '27038':{'description':'Clothing, Shoes & Jewelry / Traditional & Cultural Wear / Latin American / Serapes & Ponchos',
-                     'keywords':['serape','poncho']},
-            '39460':{'description':'Arts, Crafts & Sewing / Scrapbooking & Stamping / Pens & Markers / Pens',
-                     'keywords':['pen','pens','pencils','pencil','marker','markers']},
-            '54140':{'description':'Industrial & Scientific / Retail Store Fixtures & Equipment / Retail Displays & Racks / Countertop Display Cases',
-                     'keywords':['display']},
-            '2062': {
-                'description': 'Pet Supplies / Small Animals / Carriers',
-                'keywords': ['pet', 'carrier']
-            },
-            '29312': {
-                'description': 'Clothing, Shoes & Jewelry / Women / Accessories / Sunglasses & Eyewear',
-                'keywords': ['sunglasses', 'eyewear', 'glasses', 'glass case']
-            },
-            '29163': {
-                'description': 'Tote bags and totes',
-                'keywords': ['tote']
-            },
-            '30988': {
-                'description': 'Clothing, Shoes & Jewelry / Luggage & Travel Gear / Cosmetic Cases',
-                'keywords': ['cosmetic', 'makeup']
-            },
-            '29324': {
-                'description': 'Clothing, Shoes & Jewelry / Women / Accessories / Wallets',
-                'keywords': ['wallet', 'purse', 'coin', 'card']
-            },
-            
-            '29164': {
-                'description': 'Backpacks',
-                'keywords': ['backpack', 'laptop']
-            },
-            '24380': {
-                'description': 'Cell Phones & Accessories / Cases, Holsters & Sleeves',
-                'keywords': ['phone', 'mobile']
-            },
-            '29542': {
-                'description': 'Clothing, Shoes & Jewelry / Women / Jewelry / Necklaces',
-                'keywords': ['necklace', 'pendant','rosary']
-            },
-            '36256': {
-                'description': 'Sports & Outdoors / Sports / Leisure Sports / Pickleball / Paddles',
-                'keywords': ['paddle']
-            },
-            '19843': {
-                'description': 'Beauty & Personal Care / Foot, Hand & Nail Care / Tools & Accessories',
-                'keywords': ['nail','foot','tool']
-            },
-            '11267':{'description':'Shot Glass',
-                     'keywords':['shot glass','shotglass']},
-            '19280':{'description':'Hair Pin',
-                     'keywords':['hairpin','hair pin']},
-            '30977': {'description':'Clothing, Shoes & Jewelry / Luggage & Travel Gear / Travel Duffels',
-                      'keywords':['duffel bag','travel bag']},
-            '13027': {'description':'Home & Kitchen / Seasonal Décor / Ornaments / Pendants, Drops & Finials',
-                      'keywords':['pendant','finial','ornament','decoration']},
-            '29284': {'description':'Clothing, Shoes & Jewelry / Women / Accessories / Keyrings & Keychains',
-                      'keywords': ['keyring','keychain','key ring','key chain']},
-            '40388': {'description':'Clothing, Shoes & Jewelry / Women / Accessories / Gloves & Mittens / Women Fashion Gloves',
-                      'keywords':['gloves','mittens']},
-            '31141':{'description':'Clothing, Shoes & Jewelry / Shoe, Jewelry & Watch Accessories / Jewelry Accessories / Jewelry Boxes & Organizers / Jewelry Boxes',
-                     'keywords':['jewelry box','jewelry organizer','jewelry case', 'jewelry gift box']},
-            '29318':{'description':'Clothing, Shoes & Jewelry / Women / Accessories / Wallets, Card Cases & Money Organizers / Card & ID Cases / Card Cases',
-                     'keywords':['card case','card holder','card organizer']},
-            '19689':{'description':'Beauty & Personal Care / Tools & Accessories / Mirrors / Compact & Travel Mirrors',
-                     'keywords':['mirror']},
-            '29512':{'description':'Clothing, Shoes & Jewelry / Women / Jewelry / Jewelry Sets',
-                     'keywords':['earrings','earring']},
-            '29514':{'description':'Clothing, Shoes & Jewelry / Women / Jewelry / Earrings / Drop & Dangle',
-                     'keywords':['drop','dangle']},
-            '12139':{'description':'Home & Kitchen / Home Décor Products / Home Décor Accents / Coasters',
-                     'keywords':['coaster','coasters','coater']},
-            '39157':{"description":"Clothing, Shoes & Jewelry / Women / Handbags & Wallets / Women's Waist Packs",
-                     'keywords':['waist pack','fanny pack']},
-            '19289':{'description':'Beauty & Personal Care / Hair Care / Hair Accessories / Claws',
-                     'keywords':['claw']},
-            '19641':{'description':'Beauty & Personal Care / Tools & Accessories / Makeup Brushes & Tools / Brush Sets',
-                     'keywords':['brush']},
+    # Note: Contribution Goods will be handled separately with SKU transformation
+    
+    # Option mappings
+    'Option 1 Name': 'Variation Theme',
+    'Option 1 Value': 'Color',
+    
+    # Price mappings
+    # Note: USD Unit Retail Price is now used for pricing strategy calculation
+    # 'USD Unit Retail Price': 'List Price - USD',  # REMOVED - handled by pricing strategy
+    
+    # Dimension mappings
+    'Item Weight': 'Weight - lb',
+    'Item Length': 'Length - in',
+    'Item Width': 'Width - in',
+    'Item Height': 'Height - in',
+    
+    # Optional mappings - uncomment and modify as needed
+    # 'Product Status': 'Status',
+    # 'Product Type': 'Category',
+    # 'Product Images': 'Detail Images URL',
+    # 'Option 2 Name': 'Size',
+    # 'Option 2 Value': 'Size Value',
+}
+
+# ============================================================================
+# FIXED COLUMN VALUES DICTIONARY
+# ============================================================================
+# Configure fixed values for specific Temu columns here:
+# Key: Temu column name (from temu_template.xlsx)
+# Value: Fixed value to assign to all rows
+
+FIXED_COLUMN_VALUES = {
+    'Category': '29153',
+    'Country/Region of Origin': 'Mainland China',
+    'Province of Origin': 'Guangdong',
+    'Update or Add': 'Add',
+    'Shipping Template': 'NIMA2',
+    # Note: Size is now handled by conditional logic
+    # 'Size': 'One Size',  # REMOVED - handled by conditional logic
+    'California Proposition 65 Warning Type': 'No Warning Applicable',
+    
+    # Add more fixed values as needed:
+    # 'Status': 'Active',
+    # 'Brand': 'Your Brand Name',
+    # 'Handling Time': '1',
+    # 'Import Designation': 'General',
+    # 'Fulfillment Channel': 'FBA',
+}
+
+# ============================================================================
+# PRICING TIERS
+# ============================================================================
+# Multipliers applied to the Faire 'USD Unit Retail Price' before flooring to X.99.
+# 'default' applies to every product unless a SKU prefix tier (longest prefix
+# wins) or a category code tier matches. SKU prefix tiers take precedence.
+
+PRICING_TIERS = {
+    'default': {'base': 1.0, 'list': 1.25},
+    'sku_prefixes': {
+        # 'HBG': {'base': 1.1, 'list': 1.4},
+    },
+    'categories': {
+        # '29153': {'base': 1.0, 'list': 1.3},
+    },
+}
+
+# ============================================================================
+# DATA TRANSFORMATION FUNCTIONS
+# ============================================================================
+
+# Transformations work on a whole column (pandas Series) at once
+
+def transform_price(price_values):
+    """Transform price values to ensure they are numeric ('' where not a number)"""
+    numeric = pd.to_numeric(price_values, errors='coerce')
+    return numeric.astype(object).where(numeric.notna(), '')
+
+def transform_product_name(names):
+    """Transform product names to ensure they are stripped strings"""
+    missing = names.isna() | (names == '')
+    return names.astype(str).str.strip().astype(object).where(~missing, '')
+
+def transform_sku_to_goods(sku_value):
+    """Transform SKU to Contribution Goods by removing non-numeric suffixes"""
+    if pd.isna(sku_value) or sku_value == '':
+        return ''
+    
+    sku_str = str(sku_value).strip()
+    
+    # Remove common non-numeric suffixes (2-3 letters at the end)
+    # This handles cases like 'HBG104955BL' -> 'HBG104955'
+    if len(sku_str) > 3:
+        # Check if the last 2-3 characters are letters
+        suffix = sku_str[-3:] if len(sku_str) >= 3 else sku_str[-2:]
+        if suffix.isalpha() and len(suffix) >= 2:
+            # Remove the suffix
+            base_sku = sku_str[:-len(suffix)]
+            return base_sku
+    
+    return sku_str
+
+# Delimiters tried in order; the first one found in a value is used to split it
+IMAGE_URL_DELIMITERS = [',', ';', '|', '\n', '\r\n', ' ']
+
+def split_image_urls(image_urls):
+    """
+    Split a column of image URL strings into a wide matrix, one URL per column.
+    
+    Each value is split on the first delimiter it contains (or kept whole),
+    URLs are stripped and empty ones dropped. Returns a DataFrame with the
+    index of image_urls and columns 0..N-1: rows with URLs are padded with '',
+    rows without any URL are all NaN.
+    """
+    values = image_urls[image_urls.notna() & (image_urls != '')].astype(str)
+    
+    # One split pass per delimiter over the values that use it
+    url_parts = []
+    remaining = pd.Series(True, index=values.index)
+    for delimiter in IMAGE_URL_DELIMITERS:
+        uses_delimiter = remaining & values.str.contains(delimiter, regex=False)
+        url_parts.append(values[uses_delimiter].str.split(delimiter, regex=False).explode())
+        remaining &= ~uses_delimiter
+    url_parts.append(values[remaining])
+    
+    urls = pd.concat(url_parts).astype(str).str.strip()
+    urls = urls[urls != '']
+    
+    # Position of each URL within its value, then one column per position
+    positions = urls.groupby(level=0, sort=False).cumcount()
+    url_matrix = pd.DataFrame({'row': urls.index, 'position': positions.to_numpy(), 'url': urls.to_numpy()})
+    url_matrix = url_matrix.pivot(index='row', columns='position', values='url').fillna('')
+    url_matrix.columns.name = None
+    return url_matrix.reindex(image_urls.index)
+
+# ============================================================================
+# TRANSFORMATIONS DICTIONARY
+# ============================================================================
+# Map column names to their transformation functions. Each function receives
+# the whole Faire column as a pandas Series and returns the transformed Series.
+
+TRANSFORMATIONS = {
+    'Product Name (English)': transform_product_name,
+    'Description (English)': transform_product_name,
+    'USD Unit Retail Price': transform_price,
+}
+
+# ============================================================================
+# UTILITY FUNCTIONS
+# ============================================================================
+
+def split_data_into_chunks(data, chunk_size=1000):
+    """Split data into chunks of specified size"""
+    chunks = []
+    for i in range(0, len(data), chunk_size):
+        chunks.append(data[i:i + chunk_size])
+    return chunks
+
+def required_faire_columns():
+    """Faire columns used by the pipeline (image columns are selected by name separately)"""
+    return list(COLUMN_MAPPINGS) + [
+        'SKU',
+        'On Hand Inventory',       # stock filter
+        'USD Unit Retail Price',   # pricing strategy
+        'Option 1 Value',          # variant grouping
+        'Product Name (English)',  # category assignment
+        'Product Images',
+    ]
 
-            '10334':{'description':'Home & Kitchen / Kitchen & Dining / Storage & Organization / Thermoses / Insulated Beverage Containers / Tumblers',
-                     'keywords':['tumbler','water bottle']},
-            '30654':{'description':'Clothing, Shoes & Jewelry / Men / Accessories / Wallets, Card Cases & Money Organizers / Coin Purses & Pouches',
-                     'keywords':['coin purse','coin pouch']},
-            '36255':{'description':'Sports & Outdoors / Sports / Leisure Sports & Game Room / Outdoor Games & Activities / Pickleball / Balls',
-                     'keywords':['pickleball ball']},
-            '19284':{'description':'Beauty & Personal Care / Hair Care / Hair Accessories / Headbands',
-                     'keywords':['headband']},
-            '19285':{'description':'Beauty & Personal Care / Hair Care / Hair Accessories / Elastics & Ties',
-                     'keywords':['elastic','tie']},
-            '29270':{'description':'Clothing, Shoes & Jewelry / Women / Accessories / Hats & Caps / Baseball Caps',
-                     'keywords':['baseball cap']},
-            '12703':{'description':'Home & Kitchen / Storage & Organization / Kitchen Storage & Organization / Thermoses / Insulated Beverage Containers / Cups & Mugs',
-                     'keywords':['mug','cup']},
-            '2128':{'description':'Appliances / Small Kitchen Appliances / Blenders / Personal Size Blenders',
-                    'keywords':['blender']},
-            '39969':{'description':'Arts, Crafts & Sewing / Organization, Storage & Transport / Pen, Pencil & Marker Cases',
-                     'keywords':['pen case','pencil case','marker case','pen holder','pencil holder','marker holder']},
-            '10354':{'description':'Home & Kitchen / Kitchen & Dining / Storage & Organization / Food Storage / Food Containers / Containers',
-                     'keywords':['food container','food storage','lunch box','lunchbox','food holder','food organizer']},
-            '25491':{'description':'Toys & Games / Novelty & Gag Toys / Money Banks',
-                     'keywords':['money bank','piggy bank','tin box','tin container']},
-            '31007':{'description':'Clothing, Shoes & Jewelry / Luggage & Travel Gear / Travel Accessories / Luggage Straps',
-                     'keywords':['luggage strap','bag strap']},
-            '28969':{'description':'Clothing, Shoes & Jewelry / Women / Clothing / Coats, Jackets & Vests / Fur & Faux Fur / Faux Fur',
-                     'keywords':['fur coat','fur vest','fur coat','fur vest','fur jacket','fur vests','fur coats','fur jackets']},
-            '30253':{'description':'Clothing, Shoes & Jewelry / Novelty & More / Clothing / Novelty / Men / Accessories / Scarves',
-                     'keywords':['scarf','scarves','shawl']},
+def filter_in_stock(data_df):
+    """Keep only products with 'On Hand Inventory' > 0 (all products when the column is missing)"""
+    print("Filtering products with stock > 0...")
+    total_products = len(data_df)
+    
+    # Filter based on 'On Hand Inventory' > 0
+    if 'On Hand Inventory' in data_df.columns:
+        # Convert to numeric, handling any non-numeric values
+        inventory_data = pd.to_numeric(data_df['On Hand Inventory'], errors='coerce')
+        in_stock_mask = inventory_data > 0
+        data_df = data_df[in_stock_mask]
+        
+        filtered_products = len(data_df)
+        print(f"  Total products: {total_products}")
+        print(f"  Products with stock > 0: {filtered_products}")
+        print(f"  Products filtered out: {total_products - filtered_products}")
+    else:
+        print("  Warning: 'On Hand Inventory' column not found, processing all products")
+    return data_df
+
+def generate_chunk_filename(base_filename, chunk_number):
+    """Generate filename for a specific chunk"""
+    name, ext = base_filename.rsplit('.', 1)
+    return f"{name}_{chunk_number}.{ext}"
+
+# ============================================================================
+# MAPPING ENGINE
+# ============================================================================
+
+def apply_column_mappings(data_df, template_schema):
+    """
+    Apply COLUMN_MAPPINGS, TRANSFORMATIONS and DEFAULT_VALUES to the whole catalog.
+    
+    Every mapping is computed as whole-column operations once, before the data
+    is split into categories and chunks. Returns three frames sharing the
+    index of data_df:
+      - mapped_df: final cell values for each mapped Faire column
+      - defaults_df: True where a default value was backfilled, per Faire column
+      - missing_values_df: the missing values report (SKU, MissingValue,
+        DefaultApplied), one mapping after the other in row order
+    """
+    mapped_columns = {}
+    defaulted_columns = {}
+    missing_reports = []
+    
+    # SKU shown in the missing values report
+    if 'SKU' in data_df.columns:
+        report_skus = data_df['SKU'].astype(str).astype(object).where(data_df['SKU'].notna(), 'Unknown')
+    else:
+        report_skus = pd.Series('', index=data_df.index, dtype=object)
+    
+    quantity_col_indices = template_schema.find_all('Quantity')
+    
+    for faire_col, temu_col in COLUMN_MAPPINGS.items():
+        if faire_col not in data_df.columns or template_schema.find(temu_col, exact=False) is None:
+            continue
+        
+        values = data_df[faire_col].astype(object)
+        if faire_col in TRANSFORMATIONS:
+            values = TRANSFORMATIONS[faire_col](values)
+        
+        # Quantity is copied as-is (blank when missing) to all Quantity columns
+        if temu_col == 'Quantity' and quantity_col_indices:
+            mapped_columns[faire_col] = values.where(values.notna(), '')
+            continue
+        
+        missing = values.isna() | (values == '')
+        if temu_col in DEFAULT_VALUES:
+            default_value = DEFAULT_VALUES[temu_col]
+            mapped_columns[faire_col] = values.where(~missing, default_value)
+            defaulted_columns[faire_col] = missing
+            missing_reports.append(pd.DataFrame({
+                'SKU': report_skus[missing],
+                'MissingValue': temu_col,
+                'DefaultApplied': default_value,
+            }))
+        else:
+            mapped_columns[faire_col] = values.where(~missing, '')
+    
+    mapped_df = pd.DataFrame(mapped_columns, index=data_df.index)
+    defaults_df = pd.DataFrame(defaulted_columns, index=data_df.index)
+    if missing_reports:
+        missing_values_df = pd.concat(missing_reports)
+    else:
+        missing_values_df = pd.DataFrame(columns=['SKU', 'MissingValue', 'DefaultApplied'])
+    return mapped_df, defaults_df, missing_values_df
 
-            '3833':{'description':'Electronics / Computers & Accessories / Computer Accessories & Peripherals / USB Gadgets / USB Fans',
-                    'keywords':['usb fan','hand fan','fan']},
-            '29280': {'description':'Clothing, Shoes & Jewelry / Women / Accessories / Hats & Caps / Sun Hats',
-                      'keywords':['hat']},
-            '11809':{'description':'Home & Kitchen / Bath / Towels / Beach Towels',
-                     'keywords':['towel']},
+def calculate_prices(data_df, category_assigner=None):
+    """
+    Calculate Temu Base Price and List Price for the whole catalog.
+    
+    Uses PRICING_TIERS through the vectorized pricing engine. Category tiers
+    need the Temu category of every product, which is only determined when
+    such tiers are configured. Returns a frame with 'Base Price' and
+    'List Price' columns (NaN where the Faire price is not a number), or an
+    empty frame when the catalog has no price column.
+    """
+    if 'USD Unit Retail Price' not in data_df.columns:
+        return pd.DataFrame(index=data_df.index)
+    
+    pricing_engine = PricingEngine(PRICING_TIERS)
+    skus = data_df['SKU'] if 'SKU' in data_df.columns else None
+    
+    category_codes = None
+    if pricing_engine.uses_categories and category_assigner is not None:
+        product_names = data_df['Product Name (English)'] if 'Product Name (English)' in data_df.columns else pd.Series('', index=data_df.index)
+        image_data = data_df['Product Images'] if 'Product Images' in data_df.columns else pd.Series(None, index=data_df.index, dtype=object)
+        category_codes = category_assigner.determine_categories(product_names, image_data)
+    
+    base_prices, list_prices = pricing_engine.compute(data_df['USD Unit Retail Price'], skus=skus, category_codes=category_codes)
+    return pd.DataFrame({'Base Price': base_prices, 'List Price': list_prices}, index=data_df.index)
+
+def assign_variants(data_df):
+    """
+    Derive Contribution Goods and fill in Variation Theme / Color for products without a color.
+    
+    Runs once over the whole catalog, so variants of the same Contribution
+    Goods are numbered consistently even when they land in different chunks.
+    Products without a color get Variation Theme 'Color' and either a
+    sequential 'Color 1', 'Color 2', ... (when their Contribution Goods has
+    several products) or 'One Color'. Returns a frame with 'Contribution
+    Goods', 'Variation Theme' and 'Color' columns, where None means the
+    mapped value is kept.
+    """
+    variants_df = pd.DataFrame(index=data_df.index)
+    if 'SKU' not in data_df.columns:
+        return variants_df
+    
+    goods = derive_contribution_goods(data_df['SKU'])
+    variants_df['Contribution Goods'] = goods
+    
+    if 'Option 1 Value' in data_df.columns:
+        colors = data_df['Option 1 Value']
+        no_color = colors.isna() | (colors.astype(str).str.strip() == '')
+        
+        # Size of each Contribution Goods group, and running number of the
+        # products without a color inside their group
+        group_size = goods.groupby(goods).transform('size')
+        color_number = goods[no_color].groupby(goods[no_color]).cumcount() + 1
+        multi_variant = no_color & (group_size > 1)
+        
+        variants_df['Variation Theme'] = pd.Series('Color', index=data_df.index, dtype=object).where(no_color, None)
+        color_values = pd.Series('One Color', index=data_df.index, dtype=object)
+        color_values[multi_variant] = 'Color ' + color_number[multi_variant[no_color]].astype(str)
+        variants_df['Color'] = color_values.where(no_color, None)
+    
+    return variants_df
+
+def select_image_urls(data_df):
+    """
+    Pick the image URLs of every product and split them into a URL matrix.
+    
+    Option Image columns win over Product Images columns; within each group
+    the first non-blank column is used. Returns a frame with an 'Image Source'
+    column ('Option Image', 'Product Images' or None) followed by one
+    'Image URL n' column per URL position (see split_image_urls).
+    """
+    image_columns = [col for col in data_df.columns if 'Image' in col]
+    image_sources = pd.Series(None, index=data_df.index, dtype=object)
+    chosen_urls = pd.Series(None, index=data_df.index, dtype=object)
+    
+    for image_source, keyword in (('Option Image', 'Option'), ('Product Images', 'Product')):
+        for col in image_columns:
+            if keyword not in col:
+                continue
+            values = data_df[col]
+            usable = values.notna() & (values.astype(str).str.strip() != '') & image_sources.isna()
+            chosen_urls[usable] = values[usable]
+            image_sources[usable] = image_source
+    
+    url_matrix = split_image_urls(chosen_urls)
+    if url_matrix.columns.empty:
+        # No product has an image URL (or there are no products)
+        return image_sources.to_frame('Image Source')
+    url_matrix.columns = [f'Image URL {position + 1}' for position in url_matrix.columns]
+    return pd.concat([image_sources.rename('Image Source'), url_matrix], axis=1)
+
+# ============================================================================
+# CHUNK PROCESSING
+# ============================================================================
+
+# Template readers are created once per process and reused for every chunk
+_template_writers = {}
+
+def get_template_writer(template_file, engine):
+    """Get the template pool ('openpyxl') or XML writer ('xml') for this process"""
+    key = (template_file, engine)
+    if key not in _template_writers:
+        if engine == 'xml':
+            _template_writers[key] = TemplateXmlWriter(template_file, 'Template', data_start_row=5)
+        else:
+            _template_writers[key] = TemplatePool()
+    return _template_writers[key]
+
+def process_chunk(category_df, mapped_df, defaults_df, pricing_df, variants_df, images_df, category_codes, chunk_filename, template_file, template_schema, engine, category_assigner):
+    """
+    Write one chunk of products into a copy of the Temu template.
+    
+    Runs either in the main process or in a worker process, so everything it
+    needs is passed in explicitly. mapped_df and defaults_df are this chunk's
+    rows of the apply_column_mappings() results; pricing_df, variants_df and
+    images_df its rows of calculate_prices(), assign_variants() and
+    select_image_urls(); category_codes its Temu category codes from
+    category_assigner.determine_categories().
+    """
+    # Build the whole data region in a row buffer aligned to the template
+    # columns; it is written to the file in one go at the end
+    num_data_rows = len(category_df)
+    template_writer = get_template_writer(template_file, engine)
+    if engine == 'xml':
+        base_rows = template_writer.base_values
+    else:
+        base_rows = template_writer.base_values(template_file, 'Template', data_start_row=5)
+    template_rows = RowBuffer(base_rows, 5, template_schema.max_column, num_data_rows)
+    
+    # Look up template columns from the prebuilt schema (row 2 headers)
+    quantity_col_indices = template_schema.find_all('Quantity')
+    base_price_col_indices = template_schema.find_all('Base Price - USD')
+    list_price_col_indices = template_schema.find_all('List Price - USD')
+    
+    # Variation Theme and Size columns for conditional logic
+    variation_theme_col_idx = template_schema.find('Variation Theme')
+    size_col_idx = template_schema.find('Size')
+    
+    # Process each mapping
+    for faire_col, temu_col in COLUMN_MAPPINGS.items():
+        if faire_col in category_df.columns:
+            print(f"    Mapping: {faire_col} -> {temu_col}")
             
-            #Last Buckets to hit when all above are not found, these are the most generic categories
-            '29153':{'description':'handbag',
-                     'keywords':['handbag']},
-            '29522': {
-                'description': 'Clothing, Shoes & Jewelry / Women / Jewelry / Brooches & Pins',
-                'keywords': ['brooch', 'pin', 'jewelry', 'accessory']
-            },
-            '29264': {
-                'description': 'Clothing, Shoes & Jewelry / Women / Accessories / Belts',
-                'keywords': ['belt']
-            },
-            '28972':{'description':'Clothing, Shoes & Jewelry / Women / Clothing / Coats, Jackets & Vests / Casual Jackets',
-                     'keywords':['vest','coat','jacket']},
+            # Find the column index in Temu template
+            temu_col_idx = template_schema.find(temu_col, exact=False)
             
+            if temu_col_idx is None:
+                print(f"      Warning: Could not find column '{temu_col}' in template")
+                continue
             
-        }
+            # Transformations and defaults were applied by the mapping engine
+            if faire_col in TRANSFORMATIONS:
+                print(f"      Applied transformation: {faire_col}")
+            cell_values = mapped_df[faire_col].tolist()
+            
+            # Special handling for Quantity: populate all Quantity columns
+            if temu_col == 'Quantity' and quantity_col_indices:
+                for q_col_idx in quantity_col_indices:
+                    template_rows.set_column(q_col_idx, cell_values)
+                print(f"      Copied {len(cell_values)} values to all Quantity columns ({len(quantity_col_indices)})")
+                continue  # Skip the default single-column write below
+            
+            # Write data to template (default: single column)
+            template_rows.set_column(temu_col_idx, cell_values)
+            
+            # Report on default value usage
+            default_values_applied = int(defaults_df[faire_col].sum()) if faire_col in defaults_df.columns else 0
+            if default_values_applied > 0:
+                print(f"      Copied {len(cell_values)} values ({default_values_applied} default values applied)")
+                print(f"      Default values applied for {temu_col} - check missing_product_values.csv for details")
+            else:
+                print(f"      Copied {len(cell_values)} values")
+        else:
+            print(f"    Skipping: {faire_col} -> {temu_col} (column not found)")
+    
+    # Log default value usage summary
+    print("    Default value usage summary:")
+    for temu_col, default_val in DEFAULT_VALUES.items():
+        if temu_col in [COLUMN_MAPPINGS.get(faire_col) for faire_col in COLUMN_MAPPINGS]:
+            print(f"      {temu_col}: Default '{default_val}' (applied when source data missing)")
+    
+    # Conditional logic for Variation Theme and Color assignment
+    print("    Processing conditional Variation Theme logic...")
+    if variation_theme_col_idx is not None:
+        # Find the Color column
+        color_col_idx = template_schema.find('Color')
+        
+        # Variants were grouped by Contribution Goods over the whole catalog
+        if color_col_idx is not None and 'Color' in variants_df.columns and num_data_rows > 0:
+            theme_values = variants_df['Variation Theme'].tolist()
+            color_values = variants_df['Color'].tolist()
+            
+            template_rows.set_column(variation_theme_col_idx, theme_values)
+            template_rows.set_column(color_col_idx, color_values)
+            
+            print(f"      Applied conditional logic to {len(color_values)} rows")
+            print(f"      - Rows with color: Set Variation Theme = 'Color' (existing value)")
+            print(f"      - Rows without color: Set Variation Theme = 'Color'")
+            print(f"        - Multi-variant products: Sequential 'Color 1', 'Color 2', etc.")
+            print(f"        - Single products: 'One Color'")
+    
+    # Pricing strategy calculation
+    print("    Writing pricing strategy (tier multipliers of the Faire price, floored to X.99)...")
+    if base_price_col_indices and list_price_col_indices and len(pricing_df.columns) > 0:
+        # Prices were computed for the whole catalog by the pricing engine;
+        # rows without a valid Faire price are left unchanged
+        base_price_values = pricing_df['Base Price'].astype(object).where(pricing_df['Base Price'].notna(), None).tolist()
+        list_price_values = pricing_df['List Price'].astype(object).where(pricing_df['List Price'].notna(), None).tolist()
+        
+        # Write to all Base Price and List Price columns
+        for col_idx in base_price_col_indices:
+            template_rows.set_column(col_idx, base_price_values)
+        for col_idx in list_price_col_indices:
+            template_rows.set_column(col_idx, list_price_values)
+        
+        print(f"      Set pricing strategy for {len(base_price_values)} rows")
+        print(f"      Base Price: base multiplier x Faire price, floored, minus 1 cent")
+        print(f"      List Price: list multiplier x Faire price, floored, minus 1 cent")
+    
+    # Contribution Goods transformation
+    print("    Processing Contribution Goods transformation...")
+    if 'Contribution Goods' in variants_df.columns:
+        sku_data = category_df['SKU'].tolist()
+        contribution_goods_data = variants_df['Contribution Goods'].tolist()
+        
+        # Find the Contribution Goods column
+        contribution_goods_col_idx = template_schema.find('Contribution Goods')
+        
+        if contribution_goods_col_idx is not None:
+            template_rows.set_column(contribution_goods_col_idx, contribution_goods_data)
+            
+            print(f"      Transformed {len(contribution_goods_data)} SKUs to Contribution Goods")
+            print("      Sample transformations:")
+            for i, (sku, goods) in enumerate(zip(sku_data[:5], contribution_goods_data[:5]), 1):
+                print(f"        {i}. '{sku}' -> '{goods}'")
+    
+    # Image URL processing
+    print("    Processing Image URLs...")
+    image_columns = [col for col in category_df.columns if 'Image' in col]
+    if image_columns:
+        print(f"      Found {len(image_columns)} image columns")
+        
+        # Find SKU Images URL columns in template (column CS and beyond)
+        sku_images_col_indices = template_schema.find_all('SKU Images URL', exact=False)
+        
+        # Find Detail Images URL columns in template (column U and beyond)
+        detail_images_col_indices = template_schema.find_all('Detail Images URL', exact=False)
+        
+        if sku_images_col_indices or detail_images_col_indices:
+            print(f"      Found {len(sku_images_col_indices)} SKU Images URL columns")
+            print(f"      Found {len(detail_images_col_indices)} Detail Images URL columns")
+            
+            # Image sources and URLs were picked for the whole catalog;
+            # the counts per source come straight from the source column
+            image_sources = images_df['Image Source']
+            option_image_count = int((image_sources == 'Option Image').sum())
+            product_image_count = int((image_sources == 'Product Images').sum())
+            no_image_count = int(image_sources.isna().sum())
+            
+            url_matrix = images_df.drop(columns='Image Source').to_numpy(dtype=object)
+            has_urls = ~pd.isna(url_matrix[:, 0]) if url_matrix.shape[1] else np.zeros(num_data_rows, dtype=bool)
+            
+            # Distribute URLs sequentially across the SKU Images URL and
+            # Detail Images URL columns, leaving remaining columns blank
+            for image_col_indices in (sku_images_col_indices, detail_images_col_indices):
+                if not image_col_indices:
+                    continue
+                url_block = np.full((num_data_rows, len(image_col_indices)), '', dtype=object)
+                width = min(len(image_col_indices), url_matrix.shape[1])
+                url_block[:, :width] = url_matrix[:, :width]
+                url_block[~has_urls] = None
+                template_rows.set_block(image_col_indices, url_block.tolist())
+            
+            print(f"        Wrote image URLs for {int(has_urls.sum())} rows (up to {url_matrix.shape[1]} URLs per product)")
+            print(f"        - Used Option Image: {option_image_count} rows")
+            print(f"        - Used Product Images: {product_image_count} rows")
+            print(f"        - No image data: {no_image_count} rows")
+        else:
+            print("      Warning: No SKU Images URL or Detail Images URL columns found in template")
+    else:
+        print("      Warning: No image columns found in Faire file")
     
-    def determine_category(self, product_name, image_data=None):
-        """Determine the best category based on product name and image data"""
-        if not product_name:
-            return '29153'  # Default category
+    # Process fixed column values with conditional category assignment
+    print("    Processing fixed column values with conditional category assignment...")
+    
+    for temu_col, fixed_value in FIXED_COLUMN_VALUES.items():
+        print(f"      Setting fixed value: {temu_col} = '{fixed_value}'")
         
-        product_name_lower = product_name.lower()
+        # Find the column index in Temu template
+        temu_col_idx = template_schema.find(temu_col, exact=False)
         
-        # Check each category's keywords
-        for category_code, rule in self.category_rules.items():
-            for keyword in rule['keywords']:
-                if keyword.lower() in product_name_lower:
-                    print(f"DEBUG: Product '{product_name}' matched keyword '{keyword}' -> Category {category_code} ({rule['description']})")
-                    return category_code
+        if temu_col_idx is None:
+            print(f"        Warning: Could not find column '{temu_col}' in template")
+            continue
         
-        print(f"DEBUG: Product '{product_name}' matched no keywords -> Default Category 29153")
-        return '29153'  # Default if no match found
+        # Special handling for Category column with enhanced assignment
+        if temu_col == 'Category':
+            print("        Applying enhanced category assignment...")
+            
+            # Categories were determined for the whole catalog (one lookup per distinct name)
+            template_rows.set_column(temu_col_idx, category_codes.tolist())
+            
+            # Report category assignments with descriptions
+            print(f"        Category assignments:")
+            for _, assignment in category_assigner.count_categories(category_codes).iterrows():
+                print(f"          {assignment['Category']} ({assignment['Description']}): {assignment['Products']} products")
+        else:
+            # Write fixed value to all data rows for non-category columns
+            template_rows.fill_column(temu_col_idx, fixed_value, num_data_rows)
+        
+        print(f"        Set values for {num_data_rows} rows")
     
-    def get_category_info(self, category_code):
-        """Get category information by code"""
-        return self.category_rules.get(category_code, None)
+    # Emit the row buffer into the template and save
+    if engine == 'xml':
+        template_writer.save(template_rows, chunk_filename)
+    else:
+        workbook = template_writer.fill(template_file, template_rows.values, 'Template', data_start_row=5)
+        workbook.save(chunk_filename)
+
+def run_chunk_task(task):
+    """Process pool entry point: run process_chunk and capture its log output"""
+    output = io.StringIO()
+    with redirect_stdout(output):
+        process_chunk(*task)
+    return output.getvalue()
 
-def copy_mapped_data(filter_stock=True):
+def copy_mapped_data(filter_stock=True, engine='openpyxl', workers=1, full_update=False, trace_categories=0.0):
     """
     Enhanced tool to copy mapped data from Faire products to Temu template.
     
@@ -196,64 +658,55 @@ def copy_mapped_data(filter_stock=True):
     CHUNKING:
     All output files are now split into chunks of 1000 records each to comply with Temu's requirements.
     
+    OUTPUT ENGINES:
+    'openpyxl' loads the template through openpyxl and saves the whole workbook.
+    'xml' copies the template archive as-is and only regenerates the Template sheet
+    rows and shared strings, which is much faster and produces the same cell values.
+    
+    PARALLEL PROCESSING:
+    With workers > 1 the chunks of every category are written by a pool of worker
+    processes. Chunk filenames and the missing values report are the same as in a
+    single-process run.
+    
+    PRICE AND STOCK UPDATES:
+    The price and stock update files only contain SKUs whose base price or quantity
+    changed since they were last published (tracked in cache/published_state.sqlite).
+    Set full_update to write every SKU.
+    
     Args:
         filter_stock (bool): If True, only process products with stock > 0. Default is True.
+        engine (str): Output engine for listing files, 'openpyxl' or 'xml'. Default is 'openpyxl'.
+        workers (int): Number of worker processes for chunk generation. Default is 1 (no pool).
+        full_update (bool): If True, price/stock update files list every SKU, not only changes. Default is False.
+        trace_categories (float): Fraction of product names whose category decision is printed. Default is 0 (off).
     """
     
-    # ============================================================================
-    # DEFAULT VALUES FOR MISSING DATA
-    # ============================================================================
-    # Default values to use when Faire data is missing for specific columns
-    
-    DEFAULT_VALUES = {
-        'Weight - lb': 0.88,
-        'Length - in': 3.15,
-        'Width - in': 3.15,
-        'Height - in': 3.15
-    }
-    
     # ============================================================================
     # MISSING VALUES REPORTING SYSTEM
     # ============================================================================
-    # Track all missing values that get backfilled with defaults
+    # Track all missing values that get backfilled with defaults. The mapping
+    # engine finds them for the whole catalog; they are logged chunk by chunk
+    # so the report follows the order of the output files.
     
     missing_values_log = []
     
-    def log_missing_value(sku, temu_column, default_value):
-        """Log a missing value that was backfilled with a default"""
-        missing_values_log.append({
-            'SKU': sku,
-            'MissingValue': temu_column,
-            'DefaultApplied': default_value
-        })
-    
     def save_missing_values_report():
         """Save the missing values report to CSV file"""
-        if missing_values_log:
-            import csv
+        missing_values_df = pd.concat(missing_values_log) if missing_values_log else None
+        if missing_values_df is not None and len(missing_values_df) > 0:
             report_file = 'output/missing_product_values.csv'
             
             # Ensure output directory exists
-            import os
             os.makedirs('output', exist_ok=True)
             
             # Write CSV report
-            with open(report_file, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['SKU', 'MissingValue', 'DefaultApplied']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                writer.writeheader()
-                for record in missing_values_log:
-                    writer.writerow(record)
+            missing_values_df.to_csv(report_file, index=False, encoding='utf-8')
             
             print(f"\n📊 Missing Values Report saved to: {report_file}")
-            print(f"   Total missing values logged: {len(missing_values_log)}")
+            print(f"   Total missing values logged: {len(missing_values_df)}")
             
             # Show summary by column
-            missing_by_column = {}
-            for record in missing_values_log:
-                col = record['MissingValue']
-                missing_by_column[col] = missing_by_column.get(col, 0) + 1
+            missing_by_column = missing_values_df.groupby('MissingValue', sort=False).size()
             
             print("   Missing values by column:")
             for col, count in missing_by_column.items():
@@ -261,145 +714,6 @@ def copy_mapped_data(filter_stock=True):
         else:
             print("\n✅ No missing values detected - all products had complete data")
     
-    # ============================================================================
-    # COLUMN MAPPING DICTIONARY
-    # ============================================================================
-    # Configure your column mappings here:
-    # Key: Faire column name (from faire_products.xlsx)
-    # Value: Temu column name (from temu_template.xlsx)
-    
-    COLUMN_MAPPINGS = {
-        # Basic product information
-        'Product Name (English)': 'Product Name',
-        'Description (English)': 'Product Description',
-        'SKU': 'Contribution SKU',
-        # Note: USD Unit Retail Price is now used for pricing strategy calculation
-        # 'USD Unit Retail Price': 'Base Price - USD',  # REMOVED - handled by pricing strategy
-        'On Hand Inventory': 'Quantity',
-        'Made In Country': 'Country/Region of Origin',
-        
-        # Note: Contribution Goods will be handled separately with SKU transformation
-        
-        # Option mappings
-        'Option 1 Name': 'Variation Theme',
-        'Option 1 Value': 'Color',
-        
-        # Price mappings
-        # Note: USD Unit Retail Price is now used for pricing strategy calculation
-        # 'USD Unit Retail Price': 'List Price - USD',  # REMOVED - handled by pricing strategy
-        
-        # Dimension mappings
-        'Item Weight': 'Weight - lb',
-        'Item Length': 'Length - in',
-        'Item Width': 'Width - in',
-        'Item Height': 'Height - in',
-        
-        # Optional mappings - uncomment and modify as needed
-        # 'Product Status': 'Status',
-        # 'Product Type': 'Category',
-        # 'Product Images': 'Detail Images URL',
-        # 'Option 2 Name': 'Size',
-        # 'Option 2 Value': 'Size Value',
-    }
-    
-    # ============================================================================
-    # FIXED COLUMN VALUES DICTIONARY
-    # ============================================================================
-    # Configure fixed values for specific Temu columns here:
-    # Key: Temu column name (from temu_template.xlsx)
-    # Value: Fixed value to assign to all rows
-    
-    FIXED_COLUMN_VALUES = {
-        'Category': '29153',
-        'Country/Region of Origin': 'Mainland China',
-        'Province of Origin': 'Guangdong',
-        'Update or Add': 'Add',
-        'Shipping Template': 'NIMA2',
-        # Note: Size is now handled by conditional logic
-        # 'Size': 'One Size',  # REMOVED - handled by conditional logic
-        'California Proposition 65 Warning Type': 'No Warning Applicable',
-        
-        # Add more fixed values as needed:
-        # 'Status': 'Active',
-        # 'Brand': 'Your Brand Name',
-        # 'Handling Time': '1',
-        # 'Import Designation': 'General',
-        # 'Fulfillment Channel': 'FBA',
-    }
-    
-    # ============================================================================
-    # DATA TRANSFORMATION FUNCTIONS
-    # ============================================================================
-    
-    def transform_price(price_value):
-        """Transform price values to ensure they are numeric"""
-        if pd.isna(price_value) or price_value == '':
-            return ''
-        try:
-            return float(price_value)
-        except (ValueError, TypeError):
-            return ''
-    
-    def transform_product_name(name):
-        """Transform product names to ensure they are strings"""
-        if pd.isna(name) or name == '':
-            return ''
-        return str(name).strip()
-    
-    def transform_sku_to_goods(sku_value):
-        """Transform SKU to Contribution Goods by removing non-numeric suffixes"""
-        if pd.isna(sku_value) or sku_value == '':
-            return ''
-        
-        sku_str = str(sku_value).strip()
-        
-        # Remove common non-numeric suffixes (2-3 letters at the end)
-        # This handles cases like 'HBG104955BL' -> 'HBG104955'
-        if len(sku_str) > 3:
-            # Check if the last 2-3 characters are letters
-            suffix = sku_str[-3:] if len(sku_str) >= 3 else sku_str[-2:]
-            if suffix.isalpha() and len(suffix) >= 2:
-                # Remove the suffix
-                base_sku = sku_str[:-len(suffix)]
-                return base_sku
-        
-        return sku_str
-    
-    def split_image_urls(image_urls_str):
-        """Split image URLs and return a list of all URLs"""
-        if pd.isna(image_urls_str) or image_urls_str == '':
-            return []
-        
-        # Convert to string and split by common delimiters
-        urls_str = str(image_urls_str)
-        
-        # Split by common delimiters (comma, semicolon, pipe, newline, space)
-        delimiters = [',', ';', '|', '\n', '\r\n', ' ']
-        for delimiter in delimiters:
-            if delimiter in urls_str:
-                urls = urls_str.split(delimiter)
-                # Return all non-empty URLs
-                clean_urls = []
-                for url in urls:
-                    url_clean = url.strip()
-                    if url_clean and url_clean != '':
-                        clean_urls.append(url_clean)
-                return clean_urls
-        
-        # If no delimiters found, return the whole string as a single URL
-        return [urls_str.strip()]
-    
-    # ============================================================================
-    # TRANSFORMATIONS DICTIONARY
-    # ============================================================================
-    # Map column names to their transformation functions
-    
-    TRANSFORMATIONS = {
-        'Product Name (English)': transform_product_name,
-        'Description (English)': transform_product_name,
-        'USD Unit Retail Price': transform_price,
-    }
-    
     # ============================================================================
     # CATEGORY ASSIGNMENT SYSTEM
     # ============================================================================
@@ -416,420 +730,62 @@ def copy_mapped_data(filter_stock=True):
         }
         print(f"Added category: {category_name} with prefixes {prefixes}")
     
-    # ============================================================================
-    # UTILITY FUNCTIONS
-    # ============================================================================
-    
-    def split_data_into_chunks(data, chunk_size=1000):
-        """Split data into chunks of specified size"""
-        chunks = []
-        for i in range(0, len(data), chunk_size):
-            chunks.append(data[i:i + chunk_size])
-        return chunks
-    
-    def generate_chunk_filename(base_filename, chunk_number):
-        """Generate filename for a specific chunk"""
-        name, ext = base_filename.rsplit('.', 1)
-        return f"{name}_{chunk_number}.{ext}"
-    
     # ============================================================================
     # PROCESSING FUNCTION FOR EACH CATEGORY
     # ============================================================================
     
-    def process_product_category(product_data, template_file, output_file, category_name):
-        """Process a specific category of products and save to output file with chunking"""
+    def process_product_category(product_index, template_file, output_file, category_name, template_schema, executor=None):
+        """
+        Process a specific category of products and save to output file with chunking.
         
-        print(f"Processing {category_name} category ({len(product_data)} products)...")
+        product_index holds the row labels of the category's products in
+        data_df; every chunk is taken from data_df as a slice of it.
+        
+        Without an executor every chunk is written right away. With one, the chunks
+        are submitted to the worker processes instead. Either way the returned
+        function collects the chunk results in chunk order and prints the summary.
+        """
+        
+        print(f"Processing {category_name} category ({len(product_index)} products)...")
         
         # Split data into chunks of 1000 records
-        data_chunks = split_data_into_chunks(product_data, 1000)
+        data_chunks = split_data_into_chunks(product_index, 1000)
         print(f"  Split into {len(data_chunks)} chunks of max 1000 records each")
         
         # Process each chunk
-        for chunk_idx, chunk_data in enumerate(data_chunks, 1):
+        pending_chunks = []
+        for chunk_idx, chunk_index in enumerate(data_chunks, 1):
             chunk_filename = generate_chunk_filename(output_file, chunk_idx)
-            print(f"  Processing chunk {chunk_idx}/{len(data_chunks)}: {len(chunk_data)} products -> {chunk_filename}")
-            
-            # Copy the template file to chunk output
-            shutil.copy2(template_file, chunk_filename)
-            
-            # Load the copied workbook and modify it
-            workbook = load_workbook(chunk_filename)
-            template_sheet = workbook['Template']
+            chunk_header = f"  Processing chunk {chunk_idx}/{len(data_chunks)}: {len(chunk_index)} products -> {chunk_filename}"
+            task = (data_df.loc[chunk_index], mapped_df.loc[chunk_index], defaults_df.loc[chunk_index], pricing_df.loc[chunk_index],
+                    variants_df.loc[chunk_index], images_df.loc[chunk_index], category_codes.loc[chunk_index],
+                    chunk_filename, template_file, template_schema, engine, category_assigner)
+            missing_values_log.append(missing_values_df[missing_values_df.index.isin(chunk_index)])
             
-            # Convert chunk_data back to DataFrame for easier processing
-            category_df = pd.DataFrame(chunk_data)
-            
-            # Find all columns named 'Quantity' in the template
-            quantity_col_indices = []
-            for col_idx, cell in enumerate(template_sheet[2], 1):
-                if str(cell.value) == 'Quantity':
-                    quantity_col_indices.append(col_idx)
-            
-            # Find all columns named 'Base Price - USD' and 'List Price - USD'
-            base_price_col_indices = []
-            list_price_col_indices = []
-            for col_idx, cell in enumerate(template_sheet[2], 1):
-                if str(cell.value) == 'Base Price - USD':
-                    base_price_col_indices.append(col_idx)
-                if str(cell.value) == 'List Price - USD':
-                    list_price_col_indices.append(col_idx)
-            
-            # Find Variation Theme and Size columns for conditional logic
-            variation_theme_col_idx = None
-            size_col_idx = None
-            for col_idx, cell in enumerate(template_sheet[2], 1):
-                if str(cell.value) == 'Variation Theme':
-                    variation_theme_col_idx = col_idx
-                if str(cell.value) == 'Size':
-                    size_col_idx = col_idx
+            if executor is None:
+                print(chunk_header)
+                process_chunk(*task)
+                print(f"      Completed chunk {chunk_idx}/{len(data_chunks)}: {chunk_filename}")
+            else:
+                pending_chunks.append((chunk_idx, chunk_filename, chunk_header, executor.submit(run_chunk_task, task)))
+        
+        def finish():
+            """Collect chunk results in order and print the category summary"""
+            for chunk_idx, chunk_filename, chunk_header, future in pending_chunks:
+                chunk_output = future.result()
+                print(chunk_header)
+                print(chunk_output, end='')
+                print(f"      Completed chunk {chunk_idx}/{len(data_chunks)}: {chunk_filename}")
             
-            # Process each mapping
-            for faire_col, temu_col in COLUMN_MAPPINGS.items():
-                if faire_col in category_df.columns:
-                    print(f"    Mapping: {faire_col} -> {temu_col}")
-                    
-                    # Get source data
-                    source_data = category_df[faire_col].tolist()
-                    
-                    # Find the column index in Temu template
-                    temu_col_idx = None
-                    for col_idx, cell in enumerate(template_sheet[2], 1):  # Row 2 contains headers
-                        if temu_col in str(cell.value):
-                            temu_col_idx = col_idx
-                            break
-                    
-                    if temu_col_idx is None:
-                        print(f"      Warning: Could not find column '{temu_col}' in template")
-                        continue
-                    
-                    # Apply transformation if defined
-                    if faire_col in TRANSFORMATIONS:
-                        source_data = [TRANSFORMATIONS[faire_col](value) for value in source_data]
-                        print(f"      Applied transformation: {faire_col}")
-                    
-                    # Special handling for Quantity: populate all Quantity columns
-                    if temu_col == 'Quantity' and quantity_col_indices:
-                        for row_idx, value in enumerate(source_data, 5):
-                            # Handle NaN values
-                            cell_value = '' if pd.isna(value) else value
-                            for q_col_idx in quantity_col_indices:
-                                template_sheet.cell(row=row_idx, column=q_col_idx, value=cell_value)
-                        print(f"      Copied {len(source_data)} values to all Quantity columns ({len(quantity_col_indices)})")
-                        continue  # Skip the default single-column write below
-                    
-                    # Write data to template (default: single column)
-                    default_values_applied = 0
-                    for row_idx, value in enumerate(source_data, 5):
-                        # Handle NaN values and apply defaults if needed
-                        if pd.isna(value) or value == '':
-                            # Check if this column has a default value defined
-                            if temu_col in DEFAULT_VALUES:
-                                cell_value = DEFAULT_VALUES[temu_col]
-                                default_values_applied += 1
-                                
-                                # Get the SKU for this row to log the missing value
-                                sku_value = ''
-                                if 'SKU' in category_df.columns:
-                                    sku_value = str(category_df.iloc[row_idx - 5]['SKU']) if pd.notna(category_df.iloc[row_idx - 5]['SKU']) else 'Unknown'
-                                
-                                log_missing_value(sku_value, temu_col, cell_value)
-                            else:
-                                cell_value = ''
-                        else:
-                            cell_value = value
-                        
-                        template_sheet.cell(row=row_idx, column=temu_col_idx, value=cell_value)
-                    
-                    # Report on default value usage
-                    if default_values_applied > 0:
-                        print(f"      Copied {len(source_data)} values ({default_values_applied} default values applied)")
-                        print(f"      Default values applied for {temu_col} - check missing_product_values.csv for details")
-                    else:
-                        print(f"      Copied {len(source_data)} values")
-                else:
-                    print(f"    Skipping: {faire_col} -> {temu_col} (column not found)")
+            print(f"Completed processing {category_name} category ({len(product_index)} products) -> {len(data_chunks)} files")
             
-            # Log default value usage summary
-            print("    Default value usage summary:")
+            # Summary of default value usage for this category
+            print(f"\nDefault value summary for {category_name} category:")
             for temu_col, default_val in DEFAULT_VALUES.items():
                 if temu_col in [COLUMN_MAPPINGS.get(faire_col) for faire_col in COLUMN_MAPPINGS]:
-                    print(f"      {temu_col}: Default '{default_val}' (applied when source data missing)")
-            
-            # Conditional logic for Variation Theme and Color assignment
-            print("    Processing conditional Variation Theme logic...")
-            if variation_theme_col_idx is not None:
-                # Get the Contribution Goods data to detect duplicates
-                contribution_goods_data = []
-                if 'SKU' in category_df.columns:
-                    # Transform SKU to Contribution Goods for comparison
-                    sku_data = category_df['SKU'].tolist()
-                    contribution_goods_data = [transform_sku_to_goods(sku) for sku in sku_data]
-                
-                # Find the Color column
-                color_col_idx = None
-                for col_idx, cell in enumerate(template_sheet[2], 1):
-                    if str(cell.value) == 'Color':
-                        color_col_idx = col_idx
-                        break
-                
-                # Get the Color data that was mapped
-                color_data = []
-                if 'Option 1 Value' in category_df.columns:
-                    color_data = category_df['Option 1 Value'].tolist()
-                
-                if color_col_idx is not None and contribution_goods_data and color_data:
-                    # Count occurrences of each Contribution Goods value
-                    goods_count = {}
-                    for goods in contribution_goods_data:
-                        goods_count[goods] = goods_count.get(goods, 0) + 1
-                    
-                    # Process each row for conditional logic
-                    goods_occurrence = {}  # Track occurrence count for each goods value
-                    
-                    for row_idx, (color_value, goods_value) in enumerate(zip(color_data, contribution_goods_data), 5):
-                        if pd.isna(color_value) or str(color_value).strip() == '':
-                            # No color value - determine if this is part of a multi-variant product
-                            if goods_count.get(goods_value, 0) > 1:
-                                # Multiple variants exist - assign sequential color
-                                goods_occurrence[goods_value] = goods_occurrence.get(goods_value, 0) + 1
-                                color_number = goods_occurrence[goods_value]
-                                template_sheet.cell(row=row_idx, column=variation_theme_col_idx, value='Color')
-                                template_sheet.cell(row=row_idx, column=color_col_idx, value=f'Color {color_number}')
-                            else:
-                                # Single variant - use 'One Color'
-                                template_sheet.cell(row=row_idx, column=variation_theme_col_idx, value='Color')
-                                template_sheet.cell(row=row_idx, column=color_col_idx, value='One Color')
-                        else:
-                            # Has color value - Variation Theme stays as 'Color' (already set by mapping)
-                            # Color value is already set by the mapping
-                            pass
-                    
-                    print(f"      Applied conditional logic to {len(color_data)} rows")
-                    print(f"      - Rows with color: Set Variation Theme = 'Color' (existing value)")
-                    print(f"      - Rows without color: Set Variation Theme = 'Color'")
-                    print(f"        - Multi-variant products: Sequential 'Color 1', 'Color 2', etc.")
-                    print(f"        - Single products: 'One Color'")
-            
-            # Pricing strategy calculation
-            print("    Calculating pricing strategy (1x and 1.25x Faire price, floored to X.99)...")
-            if base_price_col_indices and list_price_col_indices:
-                # Get the USD Unit Retail Price data
-                if 'USD Unit Retail Price' in category_df.columns:
-                    price_data = category_df['USD Unit Retail Price'].tolist()
-                    
-                    for row_idx, price_value in enumerate(price_data, 5):
-                        if pd.notna(price_value) and price_value != '':
-                            try:
-                                # Convert to float and calculate pricing strategy
-                                price_float = float(price_value)
-                                
-                                # Base Price: 1x Faire price, floored to X.99
-                                base_price = math.floor(price_float) - 0.01
-                                base_price = max(0.01, base_price)  # Ensure minimum price
-                                
-                                # List Price: 1.25x Faire price, floored to X.99
-                                list_price = math.floor(price_float * 1.25) - 0.01
-                                list_price = max(base_price + 0.01, list_price)  # Ensure list price > base price
-                                
-                                # Write to all Base Price columns
-                                for col_idx in base_price_col_indices:
-                                    template_sheet.cell(row=row_idx, column=col_idx, value=base_price)
-                                
-                                # Write to all List Price columns
-                                for col_idx in list_price_col_indices:
-                                    template_sheet.cell(row=row_idx, column=col_idx, value=list_price)
-                                    
-                            except (ValueError, TypeError):
-                                # If price conversion fails, skip this row
-                                continue
-                    
-                    print(f"      Set pricing strategy for {len(price_data)} rows")
-                    print(f"      Base Price: 1x Faire price, floored, minus 1 cent")
-                    print(f"      List Price: 1.25x Faire price, floored, minus 1 cent")
-            
-            # Contribution Goods transformation
-            print("    Processing Contribution Goods transformation...")
-            if 'SKU' in category_df.columns:
-                sku_data = category_df['SKU'].tolist()
-                contribution_goods_data = [transform_sku_to_goods(sku) for sku in sku_data]
-                
-                # Find the Contribution Goods column
-                contribution_goods_col_idx = None
-                for col_idx, cell in enumerate(template_sheet[2], 1):
-                    if str(cell.value) == 'Contribution Goods':
-                        contribution_goods_col_idx = col_idx
-                        break
-                
-                if contribution_goods_col_idx is not None:
-                    for row_idx, goods_value in enumerate(contribution_goods_data, 5):
-                        template_sheet.cell(row=row_idx, column=contribution_goods_col_idx, value=goods_value)
-                    
-                    print(f"      Transformed {len(contribution_goods_data)} SKUs to Contribution Goods")
-                    print("      Sample transformations:")
-                    for i, (sku, goods) in enumerate(zip(sku_data[:5], contribution_goods_data[:5]), 1):
-                        print(f"        {i}. '{sku}' -> '{goods}'")
-            
-            # Image URL processing
-            print("    Processing Image URLs...")
-            image_columns = [col for col in category_df.columns if 'Image' in col]
-            if image_columns:
-                print(f"      Found {len(image_columns)} image columns")
-                
-                # Find SKU Images URL columns in template (column CS and beyond)
-                sku_images_col_indices = []
-                for col_idx, cell in enumerate(template_sheet[2], 1):
-                    if 'SKU Images URL' in str(cell.value):
-                        sku_images_col_indices.append(col_idx)
-                
-                # Find Detail Images URL columns in template (column U and beyond)
-                detail_images_col_indices = []
-                for col_idx, cell in enumerate(template_sheet[2], 1):
-                    if 'Detail Images URL' in str(cell.value):
-                        detail_images_col_indices.append(col_idx)
-                
-                if sku_images_col_indices or detail_images_col_indices:
-                    print(f"      Found {len(sku_images_col_indices)} SKU Images URL columns")
-                    print(f"      Found {len(detail_images_col_indices)} Detail Images URL columns")
-                    
-                    option_image_count = 0
-                    product_image_count = 0
-                    no_image_count = 0
-                    
-                    for row_idx, row in enumerate(category_df.iterrows(), 5):
-                        row_data = row[1]
-                        
-                        # Try to find image data
-                        image_urls = None
-                        image_source = None
-                        
-                        # First, try Option Image columns
-                        for col in image_columns:
-                            if 'Option' in col and pd.notna(row_data[col]) and str(row_data[col]).strip() != '':
-                                image_urls = row_data[col]
-                                image_source = 'Option Image'
-                                option_image_count += 1
-                                break
-                        
-                        # If no option image, try Product Images
-                        if image_urls is None:
-                            for col in image_columns:
-                                if 'Product' in col and pd.notna(row_data[col]) and str(row_data[col]).strip() != '':
-                                    image_urls = row_data[col]
-                                    image_source = 'Product Images'
-                                    product_image_count += 1
-                                    break
-                        
-                        if image_urls is None:
-                            no_image_count += 1
-                            continue
-                        
-                        # Process image URLs - split into list
-                        processed_urls = split_image_urls(image_urls)
-                        print(f"        Row {row_idx}: {image_source} -> {len(processed_urls)} URLs")
-                        
-                        # Distribute URLs sequentially across SKU Images URL columns
-                        if sku_images_col_indices and processed_urls:
-                            for i, col_idx in enumerate(sku_images_col_indices):
-                                if i < len(processed_urls):
-                                    template_sheet.cell(row=row_idx, column=col_idx, value=processed_urls[i])
-                                    print(f"          SKU Image {i+1}: {processed_urls[i][:50]}... -> Column {col_idx}")
-                                else:
-                                    # Leave remaining columns blank
-                                    template_sheet.cell(row=row_idx, column=col_idx, value='')
-                        
-                        # Distribute URLs sequentially across Detail Images URL columns
-                        if detail_images_col_indices and processed_urls:
-                            for i, col_idx in enumerate(detail_images_col_indices):
-                                if i < len(processed_urls):
-                                    template_sheet.cell(row=row_idx, column=col_idx, value=processed_urls[i])
-                                    print(f"          Detail Image {i+1}: {processed_urls[i][:50]}... -> Column {col_idx}")
-                                else:
-                                    # Leave remaining columns blank
-                                    template_sheet.cell(row=row_idx, column=col_idx, value='')
-                    
-                    print(f"        - Used Option Image: {option_image_count} rows")
-                    print(f"        - Used Product Images: {product_image_count} rows")
-                    print(f"        - No image data: {no_image_count} rows")
-                else:
-                    print("      Warning: No SKU Images URL or Detail Images URL columns found in template")
-            else:
-                print("      Warning: No image columns found in Faire file")
-            
-            # Process fixed column values with conditional category assignment
-            print("    Processing fixed column values with conditional category assignment...")
-            
-            for temu_col, fixed_value in FIXED_COLUMN_VALUES.items():
-                print(f"      Setting fixed value: {temu_col} = '{fixed_value}'")
-                
-                # Find the column index in Temu template
-                temu_col_idx = None
-                for col_idx, cell in enumerate(template_sheet[2], 1):  # Row 2 contains headers
-                    if temu_col in str(cell.value):
-                        temu_col_idx = col_idx
-                        break
-                
-                if temu_col_idx is None:
-                    print(f"        Warning: Could not find column '{temu_col}' in template")
-                    continue
-                
-                # Get the number of data rows
-                num_data_rows = len(category_df)
-                
-                # Special handling for Category column with enhanced assignment
-                if temu_col == 'Category':
-                    print("        Applying enhanced category assignment...")
-                    category_assignments = {}
-                    
-                    # Get product names and image data for category assignment
-                    product_names = []
-                    image_data = []
-                    if 'Product Name (English)' in category_df.columns:
-                        product_names = category_df['Product Name (English)'].tolist()
-                    if 'Product Images' in category_df.columns:
-                        image_data = category_df['Product Images'].tolist()
-                    
-                    # Process each row with enhanced category assignment
-                    for row_idx in range(5, 5 + num_data_rows):
-                        product_name = product_names[row_idx - 5] if row_idx - 5 < len(product_names) else ''
-                        img_data = image_data[row_idx - 5] if row_idx - 5 < len(image_data) else None
-                        
-                        # Use the enhanced category assigner
-                        category_code = category_assigner.determine_category(product_name, img_data)
-                        
-                        # Track category assignments for reporting
-                        if category_code not in category_assignments:
-                            category_assignments[category_code] = 0
-                        category_assignments[category_code] += 1
-                        
-                        template_sheet.cell(row=row_idx, column=temu_col_idx, value=category_code)
-                    
-                    # Report category assignments with descriptions
-                    print(f"        Category assignments:")
-                    for category_code, count in category_assignments.items():
-                        category_info = category_assigner.get_category_info(category_code)
-                        description = category_info['description'] if category_info else 'Unknown'
-                        print(f"          {category_code} ({description}): {count} products")
-                else:
-                    # Write fixed value to all data rows for non-category columns
-                    for row_idx in range(5, 5 + num_data_rows):
-                        template_sheet.cell(row=row_idx, column=temu_col_idx, value=fixed_value)
-                
-                print(f"        Set values for {num_data_rows} rows")
-            
-            # Save the workbook
-            workbook.save(chunk_filename)
-            workbook.close()
-            
-            print(f"      Completed chunk {chunk_idx}/{len(data_chunks)}: {chunk_filename}")
+                    print(f"  {temu_col}: Default '{default_val}' available for missing data")
         
-        print(f"Completed processing {category_name} category ({len(product_data)} products) -> {len(data_chunks)} files")
-        
-        # Summary of default value usage for this category
-        print(f"\nDefault value summary for {category_name} category:")
-        for temu_col, default_val in DEFAULT_VALUES.items():
-            if temu_col in [COLUMN_MAPPINGS.get(faire_col) for faire_col in COLUMN_MAPPINGS]:
-                print(f"  {temu_col}: Default '{default_val}' available for missing data")
+        return finish
     
     # ============================================================================
     # MAIN PROCESSING FUNCTION
@@ -873,16 +829,27 @@ def copy_mapped_data(filter_stock=True):
         print("📊 Missing Values Reporting: ENABLED - will track all default values applied")
         
         # Initialize category assigner
-        category_assigner = CategoryAssigner()
+        category_assigner = CategoryAssigner(trace_rate=trace_categories)
         print(f"Enhanced category rules: {len(category_assigner.category_rules)} categories available")
         
-        # Step 1: Load Faire products file
+        # Step 1: Load the product rows of the Faire file (only the columns in use)
         print("Loading Faire products file...")
-        faire_df = pd.read_excel(faire_file, sheet_name='Products')
+        data_df = read_faire_catalog(required_faire_columns(), column_keywords=['Image'],
+                                     faire_file=faire_file, sheet_name='Products')
+        print(f"  Loaded {len(data_df)} products, {len(data_df.columns)} columns")
+        
+        # Step 2: Load Temu template schema (cached on disk by template hash)
+        print("Loading Temu template schema...")
+        template_schema = TemplateSchema.load(temu_template_file)
+        print(f"  Template columns: {template_schema.max_column}")
         
-        # Step 2: Load Temu template file
-        print("Loading Temu template...")
-        temu_df = pd.read_excel(temu_template_file, sheet_name='Template', header=1)
+        # The template is read once per process and reused for every chunk
+        if engine not in OUTPUT_ENGINES:
+            raise ValueError(f"Unknown output engine '{engine}' (choose from {', '.join(OUTPUT_ENGINES)})")
+        if workers < 1:
+            raise ValueError(f"Number of workers must be at least 1 (got {workers})")
+        print(f"Output engine: {engine}")
+        print(f"Worker processes: {workers}")
         
         # Step 3: Validate mappings
         print("Validating column mappings...")
@@ -890,9 +857,9 @@ def copy_mapped_data(filter_stock=True):
         missing_temu_columns = []
         
         for faire_col, temu_col in COLUMN_MAPPINGS.items():
-            if faire_col not in faire_df.columns:
+            if faire_col not in data_df.columns:
                 missing_faire_columns.append(faire_col)
-            if temu_col not in temu_df.columns:
+            if not template_schema.find_all(temu_col):
                 missing_temu_columns.append(temu_col)
         
         if missing_faire_columns:
@@ -903,52 +870,58 @@ def copy_mapped_data(filter_stock=True):
         # Step 4: Filter and split data into categories
         print("Filtering and splitting data into categories...")
         
-        # Get data from row 4 onwards (skip header rows)
-        data_df = faire_df.iloc[3:].copy()
-        
         # Filter for products with stock > 0 (if enabled)
         if filter_stock:
-            print("Filtering products with stock > 0...")
-            total_products = len(data_df)
-            
-            # Filter based on 'On Hand Inventory' > 0
-            if 'On Hand Inventory' in data_df.columns:
-                # Convert to numeric, handling any non-numeric values
-                inventory_data = pd.to_numeric(data_df['On Hand Inventory'], errors='coerce')
-                in_stock_mask = inventory_data > 0
-                data_df = data_df[in_stock_mask]
-                
-                filtered_products = len(data_df)
-                print(f"  Total products: {total_products}")
-                print(f"  Products with stock > 0: {filtered_products}")
-                print(f"  Products filtered out: {total_products - filtered_products}")
-            else:
-                print("  Warning: 'On Hand Inventory' column not found, processing all products")
+            data_df = filter_in_stock(data_df)
         else:
             print("Stock filtering disabled - processing all products")
         
-        # Initialize category data containers
-        category_data = {category: [] for category in CATEGORY_CONFIGS.keys()}
+        # Apply column mappings, transformations and defaults to the whole catalog
+        print("Applying column mappings to all products...")
+        mapped_df, defaults_df, missing_values_df = apply_column_mappings(data_df, template_schema)
+        print(f"  Mapped {len(mapped_df.columns)} columns ({len(missing_values_df)} default values applied)")
         
-        # Split data based on SKU prefixes
-        for idx, row in data_df.iterrows():
-            sku = str(row['SKU']) if pd.notna(row['SKU']) else ''
-            assigned_category = None
-            
-            # Check each category's prefixes (except 'other' which is catch-all)
-            for category, config in CATEGORY_CONFIGS.items():
-                if category == 'other':
-                    continue  # Skip 'other' for now, it's the catch-all
-                
-                if any(sku.startswith(prefix) for prefix in config['prefixes']):
-                    assigned_category = category
-                    break
-            
-            # If no specific category found, assign to 'other'
-            if assigned_category is None:
-                assigned_category = 'other'
-            
-            category_data[assigned_category].append(row)
+        # Calculate base and list prices for the whole catalog
+        print("Calculating pricing strategy for all products...")
+        pricing_df = calculate_prices(data_df, category_assigner)
+        if len(pricing_df.columns) > 0:
+            print(f"  Priced {int(pricing_df['Base Price'].notna().sum())} of {len(pricing_df)} products")
+        else:
+            print("  Warning: 'USD Unit Retail Price' column not found, prices not set")
+        
+        # Group variants by Contribution Goods across the whole catalog
+        print("Grouping product variants by Contribution Goods...")
+        variants_df = assign_variants(data_df)
+        if 'Contribution Goods' in variants_df.columns:
+            print(f"  {variants_df['Contribution Goods'].nunique()} Contribution Goods for {len(variants_df)} products")
+        
+        # Pick and split image URLs for the whole catalog
+        print("Splitting image URLs...")
+        images_df = select_image_urls(data_df)
+        print(f"  {int(images_df['Image Source'].notna().sum())} products with image data, up to {len(images_df.columns) - 1} URLs each")
+        
+        # Determine Temu categories for the whole catalog, once per distinct product name
+        print("Assigning Temu categories...")
+        category_codes = category_assigner.determine_categories(
+            data_df['Product Name (English)'] if 'Product Name (English)' in data_df.columns else pd.Series('', index=data_df.index),
+            data_df['Product Images'] if 'Product Images' in data_df.columns else None)
+        print(f"  {category_codes.nunique()} categories for {len(category_codes)} products")
+        
+        # Route products to categories by SKU prefix in one pass over the SKU column
+        skus = data_df['SKU'].astype(str).where(data_df['SKU'].notna(), '')
+        category_labels = pd.Series('other', index=data_df.index, dtype=object)
+        unassigned = pd.Series(True, index=data_df.index)
+        
+        # Check each category's prefixes (except 'other' which is catch-all)
+        for category, config in CATEGORY_CONFIGS.items():
+            if category == 'other' or not config['prefixes']:
+                continue
+            matches = unassigned & skus.str.startswith(tuple(config['prefixes']))
+            category_labels[matches] = category
+            unassigned &= ~matches
+        
+        # Each category is the index of its rows in data_df (in catalog order)
+        category_data = {category: data_df.index[(category_labels == category).to_numpy()] for category in CATEGORY_CONFIGS.keys()}
         
         # Print category breakdown
         print("Category breakdown:")
@@ -956,12 +929,41 @@ def copy_mapped_data(filter_stock=True):
             config = CATEGORY_CONFIGS[category]
             print(f"  {category.title()}: {len(data)} products ({config['description']})")
         
-        # Process each category
-        for category, data in category_data.items():
-            if len(data) > 0:  # Only process categories with data
-                config = CATEGORY_CONFIGS[category]
-                print(f"\nProcessing {category} products...")
-                process_product_category(data, temu_template_file, config['output_file'], category)
+        # Match every SKU against PRICES.XLS once; the joined frame is indexed like
+        # data_df and drives both the price and the stock update files
+        print("Matching SKUs against PRICES.XLS...")
+        updater = None
+        price_matches = None
+        try:
+            updater = PriceStockUpdater()
+            if len(pricing_df.columns) > 0:
+                published_base_prices = pricing_df['Base Price'].astype(object).where(pricing_df['Base Price'].notna(), None)
+            else:
+                published_base_prices = pd.Series(None, index=data_df.index, dtype=object)
+            price_matches = updater.join_products(skus, published_base_prices)
+            with_sku = price_matches[price_matches['Has SKU']]
+            print(f"  Matched {int(with_sku['Matched'].sum())} of {len(with_sku)} SKUs "
+                  f"({SkuMatcher.describe(with_sku['Match Tier'])})")
+        except Exception as e:
+            print(f"  Warning: Could not match SKUs against PRICES.XLS: {e}")
+        
+        # Process each category (chunks of all categories share one worker pool)
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            category_results = []
+            for category, data in category_data.items():
+                if len(data) > 0:  # Only process categories with data
+                    config = CATEGORY_CONFIGS[category]
+                    print(f"\nProcessing {category} products...")
+                    category_results.append(
+                        process_product_category(data, temu_template_file, config['output_file'], category, template_schema, executor)
+                    )
+            
+            for finish_category in category_results:
+                finish_category()
+        finally:
+            if executor is not None:
+                executor.shutdown()
         
         print(f"\nSuccess! Output files saved to:")
         for category, config in CATEGORY_CONFIGS.items():
@@ -976,42 +978,21 @@ def copy_mapped_data(filter_stock=True):
         print("="*60)
         
         try:
-            # Initialize the price/stock updater
-            updater = PriceStockUpdater()
-            
-            # Prepare product data for price/stock updates
-            # We need all SKUs and their base prices from the processed data
-            all_skus = []
-            all_base_prices = []
-            
-            # Collect all SKUs and base prices from all categories
-            for category, data in category_data.items():
-                if len(data) > 0:
-                    for row in data:
-                        sku = str(row['SKU']) if pd.notna(row['SKU']) else ''
-                        base_price = row.get('USD Unit Retail Price', 0)
-                        
-                        if sku and sku.strip() != '':
-                            all_skus.append(sku)
-                            all_base_prices.append(base_price)
+            if price_matches is None:
+                raise RuntimeError("SKUs were not matched against PRICES.XLS")
+            if not updater.has_price_data():
+                # Never publish zero stock for every SKU because the price file could not be read
+                raise RuntimeError("No price records loaded from PRICES.XLS, update files not written")
             
-            # Create product data DataFrame for the updater
-            product_data = pd.DataFrame({
-                'SKU': all_skus,
-                'Product Name': ['Product'] * len(all_skus)  # Placeholder, not used by updater
-            })
+            # Updates cover the SKUs of all processed categories, in category order
+            processed_index = data_df.index[:0].append(list(category_data.values()))
+            update_matches = price_matches.loc[processed_index]
+            update_matches = update_matches[update_matches['Has SKU']]
             
-            print(f"Processing price and stock updates for {len(all_skus)} products...")
+            print(f"Processing price and stock updates for {len(update_matches)} products...")
             
-            # Process the updates
-            success = updater.process_updates(product_data, all_base_prices)
-            
-            if success:
-                print("✅ Price and stock update files created successfully!")
-                print(f"  Price files: {updater.price_output} (chunked)")
-                print(f"  Stock files: {updater.stock_output} (chunked)")
-            else:
-                print("❌ Some update files failed to create")
+            # Process the updates (process_updates reports the files written)
+            updater.process_updates(joined=update_matches, full=full_update)
                 
         except Exception as e:
             print(f"❌ Error during price/stock update processing: {e}")
@@ -1030,11 +1011,111 @@ def copy_mapped_data(filter_stock=True):
     except Exception as e:
         print(f"An error occurred: {e}")
 
+def sync_price_stock(filter_stock=True, include_prices=False, full_update=False, output_dir=None):
+    """
+    Write fresh stock (and optionally price) update files without generating listing files.
+    
+    The SKUs come from the cached Faire catalog read (the same read the listing
+    run uses, so it only parses the workbook when the export changed), with the
+    same stock filter. They are joined against PRICES.XLS once and only the
+    update files are written; template cloning, column mapping, variants and
+    image splitting are skipped. Price files need the Temu base prices, so
+    the pricing engine runs only when include_prices is set.
+    
+    Like copy_mapped_data, only SKUs changed since they were last published are
+    written unless full_update is set. SKUs are listed in catalog order.
+    
+    Args:
+        filter_stock (bool): If True, only sync products with stock > 0. Default is True.
+        include_prices (bool): If True, also write the price update files. Default is False.
+        full_update (bool): If True, list every SKU, not only changes. Default is False.
+        output_dir (str): Directory for the update files. Default is None (output/).
+    
+    Returns:
+        bool: True when all requested update files were created
+    """
+    try:
+        start_time = time.perf_counter()
+        faire_file = 'data/faire_products.xlsx'
+        
+        print("Loading Faire catalog SKUs...")
+        data_df = read_faire_catalog(required_faire_columns(), column_keywords=['Image'],
+                                     faire_file=faire_file, sheet_name='Products')
+        print(f"  Loaded {len(data_df)} products")
+        
+        if filter_stock:
+            data_df = filter_in_stock(data_df)
+        else:
+            print("Stock filtering disabled - syncing all products")
+        
+        skus = data_df['SKU'].astype(str).where(data_df['SKU'].notna(), '')
+        
+        base_prices = None
+        if include_prices:
+            print("Calculating base prices...")
+            category_assigner = CategoryAssigner() if PricingEngine(PRICING_TIERS).uses_categories else None
+            pricing_df = calculate_prices(data_df, category_assigner)
+            if len(pricing_df.columns) > 0:
+                base_prices = pricing_df['Base Price'].astype(object).where(pricing_df['Base Price'].notna(), None)
+        
+        updater = PriceStockUpdater()
+        if not updater.has_price_data():
+            # Never publish zero stock for every SKU because the price file could not be read
+            print("❌ No price records loaded from PRICES.XLS, update files not written")
+            return False
+        if output_dir is not None:
+            os.makedirs(output_dir, exist_ok=True)
+            updater.price_output = os.path.join(output_dir, os.path.basename(updater.price_output))
+            updater.stock_output = os.path.join(output_dir, os.path.basename(updater.stock_output))
+        
+        joined = updater.join_products(skus, base_prices)
+        success = updater.process_updates(joined=joined, full=full_update, write_prices=include_prices)
+        
+        print(f"Sync finished in {time.perf_counter() - start_time:.1f}s")
+        return success
+    
+    except FileNotFoundError as e:
+        print(f"Error: Could not find a file. Please check your file paths. Details: {e}")
+    except Exception as e:
+        print(f"An error occurred: {e}")
+    return False
+
+def watch_prices(filter_stock=True, full_update=False, poll_seconds=DEFAULT_POLL_SECONDS,
+                 settle_seconds=DEFAULT_SETTLE_SECONDS, output_root='output/price_updates'):
+    """
+    Regenerate price and stock update files whenever a price source changes.
+    
+    Runs until interrupted. Every file of PRICE_SOURCES (PRICES.XLS, HBG.xlsx)
+    is watched; each change (once the files have finished being written)
+    triggers sync_price_stock with prices; the update files go to a
+    new timestamped folder under output_root, e.g. output/price_updates/20250101-093000.
+    Runs without changes since the last publish leave no folder behind.
+    
+    Args:
+        filter_stock (bool): If True, only sync products with stock > 0. Default is True.
+        full_update (bool): If True, every run lists every SKU, not only changes. Default is False.
+        poll_seconds (float): Seconds between checks of the price files.
+        settle_seconds (float): Seconds the price files must stay unchanged before they are read.
+        output_root (str): Directory holding the timestamped output folders.
+    """
+    def publish_updates(changed_files):
+        """Write the update files for changed price files into a timestamped folder"""
+        output_dir = os.path.join(output_root, datetime.now().strftime('%Y%m%d-%H%M%S'))
+        print(f"\nGenerating price and stock updates into {output_dir}...")
+        success = sync_price_stock(filter_stock=filter_stock, include_prices=True,
+                                   full_update=full_update, output_dir=output_dir)
+        if os.path.isdir(output_dir) and not os.listdir(output_dir):
+            os.rmdir(output_dir)  # Nothing changed since the last publish
+        return success
+    
+    prices_files = [source['file'] for source in PRICE_SOURCES]
+    PriceFileWatcher(prices_files, publish_updates, poll_seconds=poll_seconds, settle_seconds=settle_seconds).run()
+
 def show_available_columns():
     """Show available columns in both files for reference."""
     try:
-        faire_df = pd.read_excel('data/faire_products.xlsx', sheet_name='Products')
-        temu_df = pd.read_excel('data/temu_template.xlsx', sheet_name='Template', header=1)
+        faire_df = read_faire_products('data/faire_products.xlsx', sheet_name='Products')
+        template_schema = TemplateSchema.load('data/temu_template.xlsx')
         
         print("AVAILABLE COLUMNS FOR MAPPING:")
         print("=" * 60)
@@ -1043,7 +1124,7 @@ def show_available_columns():
             print(f"  {i:2d}. {col}")
         
         print("\nTEMU COLUMNS:")
-        for i, col in enumerate(temu_df.columns, 1):
+        for i, col in enumerate(template_schema.headers, 1):
             print(f"  {i:2d}. {col}")
             
     except Exception as e:
@@ -1061,9 +1142,24 @@ Examples:
   python Faire2Temu.py --no-filter-stock  # Disable stock filtering (process all products)
   python Faire2Temu.py -f                 # Short form: enable stock filtering
   python Faire2Temu.py -F                 # Short form: disable stock filtering
+  python Faire2Temu.py --engine xml       # Write listing files by patching the template XML
+  python Faire2Temu.py --workers 8        # Write chunks in parallel with 8 worker processes
+  python Faire2Temu.py --full             # Price/stock update files list every SKU, not only changes
+  python Faire2Temu.py --trace-categories 0.01  # Print how 1% of the product names were categorized
+  python Faire2Temu.py sync-stock         # Only write stock update files (no listing files)
+  python Faire2Temu.py sync-stock --with-prices  # Write stock and price update files
+  python Faire2Temu.py watch-prices       # Write price/stock updates whenever a price file changes
         """
     )
     
+    parser.add_argument(
+        'command',
+        nargs='?',
+        choices=['generate', 'sync-stock', 'watch-prices'],
+        default='generate',
+        help="'generate' builds listing and update files (default); 'sync-stock' only writes update files; "
+             "'watch-prices' writes update files whenever PRICES.XLS or HBG.xlsx changes"
+    )
     parser.add_argument(
         '--filter-stock', 
         action='store_true',
@@ -1085,6 +1181,47 @@ Examples:
         action='store_true',
         help='Force disable stock filtering'
     )
+    parser.add_argument(
+        '--engine',
+        choices=OUTPUT_ENGINES,
+        default='openpyxl',
+        help='Output engine for listing files (default: openpyxl)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of worker processes for chunk generation (default: 1)'
+    )
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='Write every SKU to the price/stock update files (default: only SKUs changed since the last run)'
+    )
+    parser.add_argument(
+        '--trace-categories',
+        type=float,
+        default=0.0,
+        metavar='RATE',
+        help='Print a DEBUG line for this fraction of categorized product names, e.g. 0.01 (default: 0, off)'
+    )
+    parser.add_argument(
+        '--with-prices',
+        action='store_true',
+        help='With sync-stock, also write the price update files'
+    )
+    parser.add_argument(
+        '--poll-seconds',
+        type=float,
+        default=DEFAULT_POLL_SECONDS,
+        help=f'With watch-prices, seconds between checks of the price files (default: {DEFAULT_POLL_SECONDS:g})'
+    )
+    parser.add_argument(
+        '--settle-seconds',
+        type=float,
+        default=DEFAULT_SETTLE_SECONDS,
+        help=f'With watch-prices, seconds the price files must stay unchanged before they are read (default: {DEFAULT_SETTLE_SECONDS:g})'
+    )
     
     return parser.parse_args()
 
@@ -1100,4 +1237,11 @@ if __name__ == "__main__":
         filter_stock = True  # Default behavior
     
     print(f"Stock filtering: {'ENABLED' if filter_stock else 'DISABLED'}")
-    copy_mapped_data(filter_stock=filter_stock) 
\ No newline at end of file
+    if args.command == 'watch-prices':
+        watch_prices(filter_stock=filter_stock, full_update=args.full,
+                     poll_seconds=args.poll_seconds, settle_seconds=args.settle_seconds)
+    elif args.command == 'sync-stock':
+        sync_price_stock(filter_stock=filter_stock, include_prices=args.with_prices, full_update=args.full)
+    else:
+        copy_mapped_data(filter_stock=filter_stock, engine=args.engine, workers=args.workers, full_update=args.full,
+                         trace_categories=args.trace_categories) 
\ No newline at end of file
@@ -27,6 +27,8 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 try:
     from category_assigner import CategoryAssigner
     from Faire2Temu import copy_mapped_data
+    from price_stock_updater import is_delta_update_file
+    from template_schema import TemplateSchema
 except ImportError as e:
     st.error(f"Error importing modules: {e}")
     st.stop()
@@ -95,14 +97,15 @@ def show_home_page():
         """)
     
     with col2:
-        st.info("""
+        category_assigner = CategoryAssigner()
+        st.info(f"""
         **System Status:**
         - ✅ Category Assigner: Ready
         - ✅ Main Processor: Ready
         - ✅ Template Files: Ready
         
-        **Available Categories:** 18
-        **Default Category:** 29153
+        **Available Categories:** {len(category_assigner.category_rules)}
+        **Default Category:** {category_assigner.default_category}
         """)
     
     # Recent activity
@@ -206,20 +209,33 @@ def show_upload_page():
     with col1:
         st.checkbox("Generate update files", value=True, help="Create _update.xlsx files for existing products")
         st.checkbox("Show detailed processing logs", value=True, help="Display step-by-step processing information")
+        changes_only = st.checkbox("Only changed prices and stock", value=True, help="Price/stock update files list only SKUs changed since the last run; each run adds a new timestamped set of files, upload them in order")
     
     with col2:
         st.checkbox("Auto-categorize products", value=True, help="Use intelligent category assignment")
         st.checkbox("Calculate optimal pricing", value=True, help="Apply pricing strategy (1x and 1.25x)")
+        cpu_count = os.cpu_count() or 1
+        workers = st.number_input(
+            "Worker processes",
+            min_value=1,
+            max_value=cpu_count,
+            value=cpu_count,
+            help="Number of processes used to generate the Temu files in parallel"
+        )
     
     # Process button
     st.subheader("3. Process Files")
     
     if st.button("🚀 Process Files", type="primary", disabled=not files_ready):
         if files_ready:
-            # Clear old files from output directory before processing
+            # Clear old files from output directory before processing. Delta
+            # price/stock sets are kept: their SKUs already count as published,
+            # so a deleted set that was not uploaded would never be written again
             output_dir = Path("output")
             if output_dir.exists():
                 for file in output_dir.glob("*.xlsx"):
+                    if is_delta_update_file(file.name):
+                        continue
                     try:
                         file.unlink()
                         st.info(f"🗑️ Cleared old file: {file.name}")
@@ -243,7 +259,7 @@ def show_upload_page():
             st.success(f"✅ Saved: {prices_file.name} to data/price/")
             
             # Process the files
-            process_files(None)  # Files are now saved to disk
+            process_files(None, workers=int(workers), full_update=not changes_only)  # Files are now saved to disk
             
             # Set process complete flag and trigger rerun
             st.session_state.process_complete = True
@@ -504,7 +520,7 @@ def display_output_files_separated():
     else:
         st.error(f"❌ Output directory does not exist: {output_dir.absolute()}")
 
-def process_files(uploaded_file):
+def process_files(uploaded_file, workers=1, full_update=False):
     """Process the uploaded files using the Faire2Temu system."""
     
     # Clear previous file cache when processing new files
@@ -533,7 +549,9 @@ def process_files(uploaded_file):
             st.error("❌ Template file not found! Please ensure 'data/temu_template.xlsx' exists.")
             return
         
-        st.success("✅ Template file found (using pre-configured Temu template)")
+        # Warm the on-disk schema cache so the processing run skips reparsing the template
+        template_schema = TemplateSchema.load(str(template_path))
+        st.success(f"✅ Template file found (using pre-configured Temu template, {template_schema.max_column} columns)")
         
         # Step 3: Run the mapping process
         status_text.text("Step 3/3: Processing data...")
@@ -549,8 +567,12 @@ def process_files(uploaded_file):
                 my_env = os.environ.copy()
                 my_env["PYTHONIOENCODING"] = "utf-8"
                 
+                command = [sys.executable, "Faire2Temu.py", "--workers", str(workers)]
+                if full_update:
+                    command.append("--full")
+                
                 result = subprocess.run(
-                    [sys.executable, "Faire2Temu.py"],
+                    command,
                     capture_output=True,
                     text=True,
                     encoding='utf-8',  # Explicitly set UTF-8 encoding
@@ -642,22 +664,22 @@ def show_category_analysis_page():
         )
         
         if st.button("🔍 Test All Products") and sample_products:
-            products = [p.strip() for p in sample_products.split('\n') if p.strip()]
+            products = pd.Series([p.strip() for p in sample_products.split('\n') if p.strip()], dtype=object)
             
-            results = []
-            for product in products:
-                category_code = category_assigner.determine_category(product)
-                category_info = category_assigner.get_category_info(category_code)
-                description = category_info['description'] if category_info else "Unknown"
-                
-                results.append({
-                    "Product": product,
-                    "Category": category_code,
-                    "Description": description
-                })
+            # Classify all products in one batch (each distinct name once)
+            category_codes = category_assigner.determine_categories(products)
+            category_counts = category_assigner.count_categories(category_codes)
+            descriptions = dict(zip(category_counts['Category'], category_counts['Description']))
             
-            df_results = pd.DataFrame(results)
+            df_results = pd.DataFrame({
+                "Product": products,
+                "Category": category_codes,
+                "Description": category_codes.map(descriptions)
+            })
             st.dataframe(df_results, use_container_width=True)
+            
+            st.write("**Products per category:**")
+            st.dataframe(category_counts, use_container_width=True)
     
     except Exception as e:
         st.error(f"Error loading category assigner: {e}")
@@ -1,11 +1,13 @@
 import pandas as pd
 import re
 
+from faire_ingest import read_faire_products
+
 def analyze_bag_prefixes():
     """Analyze Faire products to identify bag/handbag prefixes"""
     
     print("Loading Faire products file...")
-    faire_df = pd.read_excel('data/faire_products.xlsx', sheet_name='Products')
+    faire_df = read_faire_products('data/faire_products.xlsx', sheet_name='Products')
     
     print(f"Total products: {len(faire_df)}")
     print(f"Columns: {list(faire_df.columns)}")
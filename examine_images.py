@@ -1,13 +1,15 @@
 import pandas as pd
 import re
 
+from faire_ingest import read_faire_products
+
 def examine_image_data():
     """Examine image URLs and data in the faire_products.xlsx file"""
     
     try:
         # Load the Faire products file
         print("Loading Faire products file...")
-        faire_df = pd.read_excel('data/faire_products.xlsx', sheet_name='Products')
+        faire_df = read_faire_products('data/faire_products.xlsx', sheet_name='Products')
         
         # Get data from row 4 onwards (skip header rows)
         data_df = faire_df.iloc[3:].copy()
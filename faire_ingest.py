@@ -0,0 +1,250 @@
+"""
+Faire Ingest Module for Faire2Temu
+
+Parsing the Faire export (data/faire_products.xlsx) is the slowest step of a
+cold run. This module parses each export once and keeps a columnar copy under
+cache/, keyed by the file's content hash. Every later read of the same export
+(repeated CLI runs, Streamlit reruns, the analysis scripts) loads the cached
+copy instead of the workbook.
+
+The cache is written as Parquet when pyarrow is installed and the sheet can
+be stored that way. Otherwise (for example, columns mixing the instruction
+text rows with numbers) pandas' own pickle format is used, which keeps every
+value and dtype as read.
+
+read_faire_catalog() is the pipeline's reader: it loads only the columns the
+mapping needs, drops the instruction rows while parsing and gives inventory,
+price and SKU proper dtypes.
+
+Usage:
+    from faire_ingest import read_faire_products, read_faire_catalog
+
+    faire_df = read_faire_products('data/faire_products.xlsx')
+    catalog_df = read_faire_catalog(['SKU', 'On Hand Inventory'], column_keywords=['Image'])
+"""
+
+import hashlib
+import os
+from typing import Iterable, Optional
+
+import pandas as pd
+
+from template_schema import file_hash
+
+FAIRE_PRODUCTS_FILE = 'data/faire_products.xlsx'
+FAIRE_SHEET = 'Products'
+INGEST_CACHE_DIR = 'cache/faire_ingest'
+
+# Rows below the header of the Products sheet that describe the fields
+# (instructions and examples) rather than products
+INSTRUCTION_ROWS = 3
+
+# Column dtypes of the typed catalog read
+NUMERIC_COLUMNS = ('On Hand Inventory', 'USD Unit Retail Price')
+STRING_COLUMNS = ('SKU',)
+
+# Number of cached exports kept; older entries are removed when a new one is added
+MAX_CACHED_EXPORTS = 5
+
+# Bump when the cached layout changes so stale caches are ignored
+INGEST_VERSION = 2
+
+CACHE_FORMATS = ('parquet', 'pkl')
+
+
+def parquet_available() -> bool:
+    """Check whether pandas can write Parquet files (needs pyarrow)."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def cache_key(faire_file: str, sheet_name: str = FAIRE_SHEET, variant: str = 'raw') -> str:
+    """
+    Build the cache key of one read of an export.
+
+    Args:
+        faire_file: Path to the Faire export
+        sheet_name: Sheet that is read
+        variant: Name of the read (different reads of one file are cached separately)
+
+    Returns:
+        Key made of the content hash, sheet, variant and cache version
+    """
+    safe_sheet = ''.join(ch if ch.isalnum() else '_' for ch in sheet_name)
+    return f"{file_hash(faire_file)}_{safe_sheet}_{variant}_v{INGEST_VERSION}"
+
+
+def load_cached(key: str, cache_dir: str = INGEST_CACHE_DIR, columns=None) -> Optional[pd.DataFrame]:
+    """
+    Load a cached frame.
+
+    Args:
+        key: Cache key (see cache_key)
+        cache_dir: Directory holding the cached frames
+        columns: Only load these columns (None for all)
+
+    Returns:
+        The cached DataFrame, or None when there is no usable entry
+    """
+    for cache_format in CACHE_FORMATS:
+        cache_file = os.path.join(cache_dir, f"{key}.{cache_format}")
+        if not os.path.exists(cache_file):
+            continue
+        try:
+            if cache_format == 'parquet':
+                df = pd.read_parquet(cache_file, columns=columns)
+            else:
+                df = pd.read_pickle(cache_file)
+                if columns is not None:
+                    df = df[columns]
+        except Exception as e:
+            print(f"Warning: Ignoring unreadable ingest cache {cache_file}: {e}")
+            continue
+
+        # Mark the entry as recently used
+        try:
+            os.utime(cache_file)
+        except OSError:
+            pass
+        return df
+    return None
+
+
+def store_cached(df: pd.DataFrame, key: str, cache_dir: str = INGEST_CACHE_DIR) -> Optional[str]:
+    """
+    Store a frame in the cache, as Parquet when possible.
+
+    Args:
+        df: Frame to cache
+        key: Cache key (see cache_key)
+        cache_dir: Directory holding the cached frames
+
+    Returns:
+        Path of the cache file, or None when the frame could not be cached
+    """
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except OSError as e:
+        print(f"Warning: Could not create ingest cache directory {cache_dir}: {e}")
+        return None
+
+    for cache_format in CACHE_FORMATS:
+        if cache_format == 'parquet' and not parquet_available():
+            continue
+        cache_file = os.path.join(cache_dir, f"{key}.{cache_format}")
+        tmp_file = f"{cache_file}.tmp"
+        try:
+            if cache_format == 'parquet':
+                df.to_parquet(tmp_file, index=True)
+            else:
+                df.to_pickle(tmp_file)
+            os.replace(tmp_file, cache_file)
+        except Exception as e:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            if cache_format == 'parquet':
+                continue  # e.g. columns mixing text and numbers: fall back to pickle
+            print(f"Warning: Could not write ingest cache {cache_file}: {e}")
+            return None
+
+        prune_cache(cache_dir)
+        return cache_file
+    return None
+
+
+def prune_cache(cache_dir: str = INGEST_CACHE_DIR, keep: int = MAX_CACHED_EXPORTS):
+    """Remove all but the ``keep`` most recently used exports from the cache."""
+    entries = {}
+    for name in os.listdir(cache_dir):
+        if name.endswith(CACHE_FORMATS) and '_' in name:
+            path = os.path.join(cache_dir, name)
+            content_hash = name.split('_', 1)[0]
+            entries[content_hash] = max(entries.get(content_hash, 0), os.path.getmtime(path))
+
+    stale = sorted(entries, key=entries.get, reverse=True)[keep:]
+    for name in os.listdir(cache_dir):
+        if name.split('_', 1)[0] in stale:
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
+
+
+def read_faire_products(faire_file: str = FAIRE_PRODUCTS_FILE, sheet_name: str = FAIRE_SHEET,
+                        cache_dir: str = INGEST_CACHE_DIR) -> pd.DataFrame:
+    """
+    Read a Faire export sheet, parsing the workbook only the first time.
+
+    Returns the same frame as ``pd.read_excel(faire_file, sheet_name=sheet_name)``,
+    including the instruction rows at the top of the Products sheet.
+
+    Args:
+        faire_file: Path to the Faire export (.xlsx)
+        sheet_name: Sheet to read
+        cache_dir: Directory holding the cached frames
+
+    Returns:
+        DataFrame with the sheet contents
+    """
+    key = cache_key(faire_file, sheet_name)
+    df = load_cached(key, cache_dir)
+    if df is not None:
+        return df
+
+    df = pd.read_excel(faire_file, sheet_name=sheet_name)
+    store_cached(df, key, cache_dir)
+    return df
+
+
+def read_faire_catalog(columns: Iterable[str], column_keywords: Iterable[str] = (),
+                       faire_file: str = FAIRE_PRODUCTS_FILE, sheet_name: str = FAIRE_SHEET,
+                       cache_dir: str = INGEST_CACHE_DIR) -> pd.DataFrame:
+    """
+    Read the product rows of a Faire export, limited to the columns in use.
+
+    The instruction rows below the header are skipped while parsing and the
+    columns keep their order in the sheet. Inventory and price become
+    numeric (NaN where not a number), SKU becomes a string column. The
+    result is cached per export and column selection.
+
+    Args:
+        columns: Names of the columns to read (missing ones are ignored)
+        column_keywords: Also read every column whose name contains one of these
+        faire_file: Path to the Faire export (.xlsx)
+        sheet_name: Sheet to read
+        cache_dir: Directory holding the cached frames
+
+    Returns:
+        DataFrame with one row per product
+    """
+    columns = sorted(set(columns))
+    column_keywords = sorted(set(column_keywords))
+    selection = '|'.join(columns) + '||' + '|'.join(column_keywords)
+    variant = 'catalog_' + hashlib.sha1(selection.encode('utf-8')).hexdigest()[:12]
+
+    key = cache_key(faire_file, sheet_name, variant)
+    df = load_cached(key, cache_dir)
+    if df is not None:
+        return df
+
+    wanted = set(columns)
+
+    def use_column(name) -> bool:
+        return name in wanted or any(keyword in str(name) for keyword in column_keywords)
+
+    df = pd.read_excel(faire_file, sheet_name=sheet_name, usecols=use_column,
+                       skiprows=range(1, INSTRUCTION_ROWS + 1))
+
+    for column in NUMERIC_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors='coerce')
+    for column in STRING_COLUMNS:
+        if column in df.columns:
+            # Missing values stay missing (older pandas would turn them into 'nan')
+            df[column] = df[column].astype(str).where(df[column].notna())
+
+    store_cached(df, key, cache_dir)
+    return df
@@ -1,7 +1,59 @@
-import pandas as pd
-import shutil
-from openpyxl import load_workbook
+import glob
+import os
+import re
+import tempfile
+import time
 import warnings
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from price_sources import PriceSourceRegistry, describe_sources, normalize_item_numbers
+from published_state import PUBLISHED_STATE_DB, PublishedState
+from sku_matching import SkuMatcher
+from template_pool import TemplatePool
+
+# ERP price export (replaced several times a day)
+PRICES_FILE = 'data/price/PRICES.XLS'
+
+# Price sources in precedence order: for each SKU and field the first source
+# with a value wins (see price_sources.py). HBG.xlsx carries the handbag price
+# list, which overrides the general PRICES.XLS prices; quantities come from
+# PRICES.XLS, the more frequently exported file.
+PRICE_SOURCES = [
+    {
+        'name': 'HBG',
+        'file': 'data/price/HBG.xlsx',
+        'sheet': 'HBG',
+        'header': 3,
+        'columns': {'Item #': 'Item #', 'Price': 'Sale Price'},
+        'required': False,
+    },
+    {
+        'name': 'PRICES',
+        'file': PRICES_FILE,
+        'sheet': 'Sheet1',
+        'header': 5,
+        'columns': {'Item #': 'Item #', 'On-hand Qty': 'On-hand Qty', 'Sale Price': 'Sale Price'},
+        'required': True,
+    },
+]
+
+# Chunk files of a delta update set, e.g. temu_stock_update_20250101-093000_1.xlsx
+# (see PriceStockUpdater.delta_outputs)
+DELTA_UPDATE_FILE = re.compile(r'temu_(price|stock)_update_\d{8}-\d{6}(-\d+)?_\d+\.xlsx')
+
+
+def is_delta_update_file(filename):
+    """
+    Whether filename is a chunk of a delta update set.
+
+    Delta sets only hold SKUs that are already recorded as published, so
+    they must not be deleted before they are uploaded.
+    """
+    return DELTA_UPDATE_FILE.fullmatch(os.path.basename(filename)) is not None
+
 
 # Suppress openpyxl warnings
 warnings.filterwarnings('ignore', category=UserWarning, module='openpyxl')
@@ -9,124 +61,224 @@ warnings.filterwarnings('ignore', category=UserWarning, module='openpyxl')
 class PriceStockUpdater:
     """Handles price and stock updates from PRICES.XLS file"""
 
-    def __init__(self):
-        self.prices_file = 'data/price/PRICES.XLS'
+    def __init__(self, price_sources=None):
+        self.prices_file = PRICES_FILE
+        self.price_sources = PRICE_SOURCES if price_sources is None else price_sources
         self.price_template = 'data/temu_price_template.xlsx'
         self.stock_template = 'data/temu_stock_template.xlsx'
         self.price_output = 'output/temu_price_update.xlsx'
         self.stock_output = 'output/temu_stock_update.xlsx'
+        self.last_price_output = None   # Files written by the last process_updates() (None when not written)
+        self.last_stock_output = None
+
+        # Last published price / quantity per SKU (for delta-only updates)
+        self.published_state_db = PUBLISHED_STATE_DB
 
-        # Load PRICES.XLS data
+        # Price and stock templates are parsed once and reused for every chunk
+        self.template_pool = TemplatePool()
+
+        # Load the price sources and index them by normalized Item #
         self.prices_df = None
+        self.sku_positions = {}
+        self.load_seconds = None   # Time taken by the last load_prices_data()
+        self.load_source = None    # 'cache' or 'file' (any source read from its file)
         self.load_prices_data()
 
     def load_prices_data(self):
-        """Load and prepare PRICES.XLS data"""
+        """
+        Load and merge the price sources.
+
+        Sources (PRICE_SOURCES) are read in parallel, only the Item #, price
+        and quantity columns of each. Their cleaned snapshots are cached
+        under cache/prices keyed by each file's content hash, so later runs
+        (CLI or web app) skip parsing a file until it changes. The merged
+        records keep the source of every price and quantity.
+        """
+        start_time = time.perf_counter()
+        registry = PriceSourceRegistry(self.price_sources)
         try:
-            print("Loading PRICES.XLS data...")
-            # Read starting from row 6 (header=5 means row 6 is the header)
-            self.prices_df = pd.read_excel(self.prices_file, sheet_name='Sheet1', header=5)
-
-            # Clean up the data
-            self.prices_df = self.prices_df.dropna(subset=['Item #'])  # Remove rows without SKU
-
-            # Convert relevant columns to appropriate types
-            self.prices_df['On-hand Qty'] = pd.to_numeric(self.prices_df['On-hand Qty'], errors='coerce').fillna(0)
-            self.prices_df['Sale Price'] = pd.to_numeric(self.prices_df['Sale Price'], errors='coerce')
+            print("Loading price data (" + ', '.join(source['name'] for source in self.price_sources) + ")...")
+            self.prices_df = registry.load()
+            self.load_source = 'file' if any(entry['origin'] == 'file' for entry in registry.load_stats.values()) else 'cache'
 
-            print(f"  Loaded {len(self.prices_df)} price records")
-            print(f"  Columns: {list(self.prices_df.columns)}")
+            self.load_seconds = time.perf_counter() - start_time
+            print(f"  Loaded {len(self.prices_df)} price records in {self.load_seconds:.2f}s (from {self.load_source})")
+            print(f"  Sources: {describe_sources(registry.load_stats)}")
 
         except Exception as e:
-            print(f"Error loading PRICES.XLS: {e}")
+            print(f"Error loading price data: {e}")
             self.prices_df = pd.DataFrame()
+            self.load_seconds = time.perf_counter() - start_time
+
+        self.build_index()
+
+    def has_price_data(self):
+        """Whether any price records were loaded (update files must not be written otherwise)"""
+        return self.prices_df is not None and not self.prices_df.empty
+
+    def build_index(self):
+        """
+        Build the SKU index over the loaded price records.
+
+        Maps each normalized Item # to a position in aligned price and stock
+        arrays (the first record wins when an Item # repeats), so lookups
+        no longer scan the price table and cost the same however many
+        sources were merged. The same records, with their source columns,
+        are kept as sku_table, indexed by normalized Item #, for
+        join_products(). SKUs without an exact match are resolved through
+        the tiered sku_matcher (see sku_matching.py), built here once.
+        """
+        if self.prices_df is None or self.prices_df.empty:
+            keys = pd.Series([], dtype=object)
+            records = pd.DataFrame({'Sale Price': [], 'On-hand Qty': []})
+        else:
+            keys = normalize_item_numbers(self.prices_df['Item #'])
+            first = (~keys.duplicated(keep='first') & (keys != '')).to_numpy()
+            keys = keys[first]
+            records = self.prices_df.drop(columns='Item #')[first]
+
+        self.sku_index = pd.Index(keys.tolist(), dtype=object)
+        self.sku_positions = {key: position for position, key in enumerate(keys.tolist())}
+        self.index_prices = records['Sale Price'].to_numpy(dtype=float)
+        self.index_stock = np.nan_to_num(records['On-hand Qty'].to_numpy(dtype=float))  # No source with a quantity: none on hand
+        self.sku_table = records.set_axis(self.sku_index, axis=0)
+        self.sku_table['On-hand Qty'] = self.index_stock
+        self.sku_matcher = SkuMatcher(keys)
+
+    def _position(self, sku):
+        """Position of a SKU's record in the index (None when it matches no tier)"""
+        position = self.sku_positions.get(normalize_item_numbers([sku])[0])
+        if position is None:
+            positions, _ = self.sku_matcher.match([sku])
+            position = positions[0] if positions[0] >= 0 else None
+        return position
+
+    def join_products(self, skus, base_prices=None):
+        """
+        Match products against the merged price records in one merge.
+
+        The result holds everything both update files need, so SKU matching
+        is done once per run. New base price is the resolved sale price,
+        or the current base price where there is none; New quantity is the
+        on-hand quantity, or 0 for SKUs in no price source. The source
+        columns tell which price source each value came from.
+
+        Args:
+            skus: Product SKUs (a Series keeps its index in the result)
+            base_prices: Current Temu base price of each product, aligned with skus
+
+        SKUs are matched exact, then normalized, then by base goods (see
+        sku_matching.py); 'Match Tier' tells which tier matched.
+
+        Returns:
+            DataFrame indexed like skus with the columns 'SKU', 'Has SKU',
+            'Matched', 'Match Tier', 'Current base price', 'Sale Price',
+            'On-hand Qty', 'New base price' and 'New quantity', plus
+            'Sale Price Source' and 'On-hand Qty Source' when the records
+            came from the price sources
+        """
+        skus = skus if isinstance(skus, pd.Series) else pd.Series(list(skus), dtype=object)
+        if base_prices is None:
+            base_prices = [None] * len(skus)
+
+        sku_text = skus.astype(object).where(skus.isna(), skus.astype(str))
+        positions, tiers = self.sku_matcher.match(skus)
+        products = pd.DataFrame({
+            'SKU': sku_text,
+            'Has SKU': (skus.notna() & (sku_text.astype(str).str.strip() != '')).to_numpy(),
+            'Match Tier': tiers,
+            'Current base price': pd.Series(list(base_prices), index=skus.index, dtype=object),
+            'position': positions,
+        }, index=skus.index)
+
+        joined = pd.merge(products, self.sku_table.reset_index(drop=True), how='left', left_on='position',
+                          right_index=True, indicator='Matched')
+        joined.index = skus.index
+        joined['Matched'] = (joined['Matched'] == 'both') & joined['Has SKU']
+
+        # Fallbacks: keep the current base price, no stock for unknown SKUs
+        sale_prices = joined['Sale Price'].astype(object)
+        joined['New base price'] = sale_prices.where(joined['Sale Price'].notna(), joined['Current base price'])
+        joined['New quantity'] = joined['On-hand Qty'].fillna(0)
+        return joined.drop(columns='position')
+
+    def resolve(self, sku):
+        """
+        Get the resolved price record of a SKU with its provenance.
+
+        Returns:
+            Dictionary with 'Sale Price', 'On-hand Qty' and, when the records
+            came from the price sources, the '<field> Source' of each; None
+            when the SKU is in no source
+        """
+        position = self._position(sku)
+        if position is None:
+            return None
+        return self.sku_table.iloc[position].to_dict()
+
+    def lookup_many(self, skus):
+        """
+        Look up the price records of many SKUs at once.
+
+        Args:
+            skus: SKUs to look up (any sequence, e.g. a chunk's SKU column)
+
+        Returns:
+            Tuple of arrays aligned with skus: sale prices (NaN when not found
+            or without a price), on-hand quantities (0 when not found) and a
+            boolean array telling which SKUs were found
+        """
+        positions, _ = self.sku_matcher.match(skus)
+        found = positions >= 0
+        prices = np.full(len(positions), np.nan)
+        stock = np.zeros(len(positions))
+        prices[found] = self.index_prices[positions[found]]
+        stock[found] = self.index_stock[positions[found]]
+        return prices, stock, found
 
     def get_price_for_sku(self, sku):
         """Get sale price for a given SKU"""
-        if self.prices_df is None or self.prices_df.empty:
+        position = self._position(sku)
+        if position is None:
             return None
-
-        # Find matching SKU
-        match = self.prices_df[self.prices_df['Item #'] == sku]
-        if not match.empty:
-            return match.iloc[0]['Sale Price']
-        return None
+        return self.index_prices[position]
 
     def get_stock_for_sku(self, sku):
         """Get stock quantity for a given SKU"""
-        if self.prices_df is None or self.prices_df.empty:
+        position = self._position(sku)
+        if position is None:
             return 0
-
-        # Find matching SKU
-        match = self.prices_df[self.prices_df['Item #'] == sku]
-        if not match.empty:
-            return match.iloc[0]['On-hand Qty']
-        return 0
-
-    def create_price_update_file(self, product_data, base_prices):
-        """Create price update file from product data with chunking"""
+        return self.index_stock[position]
+
+    def create_price_update_file(self, joined, output_file=None):
+        """
+        Create price update file from matched product data with chunking.
+
+        joined is the frame returned by join_products(); its Current base
+        price holds the Temu base price of each product as computed by the
+        pricing engine for the listing files. Chunks are written next to
+        output_file (default: price_output) with a _N suffix.
+        """
+        output_file = output_file or self.price_output
         try:
             print("Creating price update files with chunking...")
 
-            # Split data into chunks of 1000 records
-            chunk_size = 1000
-            total_records = len(product_data)
-            chunks = []
-            
-            for i in range(0, total_records, chunk_size):
-                chunk_end = min(i + chunk_size, total_records)
-                chunk_data = product_data.iloc[i:chunk_end]
-                chunk_prices = base_prices[i:chunk_end]
-                chunks.append((chunk_data, chunk_prices))
-
-            print(f"  Split {total_records} records into {len(chunks)} chunks")
+            chunks = self.split_chunks(joined)
+            print(f"  Split {len(joined)} records into {len(chunks)} chunks")
 
             # Process each chunk
-            for chunk_idx, (chunk_data, chunk_prices) in enumerate(chunks, 1):
-                chunk_filename = self.price_output.replace('.xlsx', f'_{chunk_idx}.xlsx')
+            for chunk_idx, chunk_data in enumerate(chunks, 1):
+                chunk_filename = output_file.replace('.xlsx', f'_{chunk_idx}.xlsx')
                 print(f"  Creating chunk {chunk_idx}/{len(chunks)}: {len(chunk_data)} records -> {chunk_filename}")
 
-                # Copy template
-                shutil.copy2(self.price_template, chunk_filename)
-
-                # Load workbook
-                workbook = load_workbook(chunk_filename)
-                sheet = workbook.active
-                
-                # Check if sheet is valid
-                if sheet is None:
-                    print(f"    Error: No active sheet found in {chunk_filename}")
-                    continue
-
-                # Prepare data for this chunk
-                price_data = []
-                for i, (sku, base_price) in enumerate(zip(chunk_data['SKU'], chunk_prices)):
-                    if pd.notna(sku) and str(sku).strip() != '':
-                        # Get new price from PRICES.XLS
-                        new_price = self.get_price_for_sku(str(sku))
-
-                        # If no new price found, use base price
-                        if new_price is None or pd.isna(new_price):
-                            new_price = base_price
-
-                        price_data.append({
-                            'SKU ID': str(sku),
-                            'Current base price': base_price,
-                            'New base price': new_price
-                        })
-
                 # Write data starting from row 2 (row 1 has headers)
-                for i, row_data in enumerate(price_data, 2):
-                    sheet.cell(row=i, column=1, value=row_data['SKU ID'])
-                    sheet.cell(row=i, column=2, value=row_data['Current base price'])
-                    sheet.cell(row=i, column=3, value=row_data['New base price'])
-
-                # Save workbook
+                price_rows = chunk_data[['SKU', 'Current base price', 'New base price']].values.tolist()
+                workbook = self.template_pool.fill(self.price_template, price_rows, data_start_row=2)
                 workbook.save(chunk_filename)
-                workbook.close()
 
-                print(f"    Created chunk {chunk_idx} with {len(price_data)} records")
+                print(f"    Created chunk {chunk_idx} with {len(price_rows)} records")
 
+            self.remove_stale_chunks(output_file, len(chunks))
             print(f"  Created {len(chunks)} price update files")
             return True
 
@@ -134,65 +286,28 @@ class PriceStockUpdater:
             print(f"Error creating price update files: {e}")
             return False
 
-    def create_stock_update_file(self, product_data):
-        """Create stock update file from product data with chunking"""
+    def create_stock_update_file(self, joined, output_file=None):
+        """Create stock update file from matched product data (see join_products) with chunking"""
+        output_file = output_file or self.stock_output
         try:
             print("Creating stock update files with chunking...")
 
-            # Split data into chunks of 1000 records
-            chunk_size = 1000
-            total_records = len(product_data)
-            chunks = []
-            
-            for i in range(0, total_records, chunk_size):
-                chunk_end = min(i + chunk_size, total_records)
-                chunk_data = product_data.iloc[i:chunk_end]
-                chunks.append(chunk_data)
-
-            print(f"  Split {total_records} records into {len(chunks)} chunks")
+            chunks = self.split_chunks(joined)
+            print(f"  Split {len(joined)} records into {len(chunks)} chunks")
 
             # Process each chunk
             for chunk_idx, chunk_data in enumerate(chunks, 1):
-                chunk_filename = self.stock_output.replace('.xlsx', f'_{chunk_idx}.xlsx')
+                chunk_filename = output_file.replace('.xlsx', f'_{chunk_idx}.xlsx')
                 print(f"  Creating chunk {chunk_idx}/{len(chunks)}: {len(chunk_data)} records -> {chunk_filename}")
 
-                # Copy template
-                shutil.copy2(self.stock_template, chunk_filename)
-
-                # Load workbook
-                workbook = load_workbook(chunk_filename)
-                sheet = workbook.active
-                
-                # Check if sheet is valid
-                if sheet is None:
-                    print(f"    Error: No active sheet found in {chunk_filename}")
-                    continue
-
-                # Prepare data for this chunk
-                stock_data = []
-                for sku in chunk_data['SKU']:
-                    if pd.notna(sku) and str(sku).strip() != '':
-                        # Get stock from PRICES.XLS
-                        stock_qty = self.get_stock_for_sku(str(sku))
-
-                        stock_data.append({
-                            'SKU': str(sku),
-                            'SKU ID': '',  # Leave blank as requested
-                            'New quantity': stock_qty
-                        })
-
-                # Write data starting from row 3 (row 2 has headers)
-                for i, row_data in enumerate(stock_data, 3):
-                    sheet.cell(row=i, column=1, value=row_data['SKU'])
-                    sheet.cell(row=i, column=2, value=row_data['SKU ID'])
-                    sheet.cell(row=i, column=3, value=row_data['New quantity'])
-
-                # Save workbook
+                # Write data starting from row 3 (row 2 has headers); SKU ID is left blank as requested
+                stock_rows = [[sku, '', quantity] for sku, quantity in zip(chunk_data['SKU'], chunk_data['New quantity'])]
+                workbook = self.template_pool.fill(self.stock_template, stock_rows, data_start_row=3)
                 workbook.save(chunk_filename)
-                workbook.close()
 
-                print(f"    Created chunk {chunk_idx} with {len(stock_data)} records")
+                print(f"    Created chunk {chunk_idx} with {len(stock_rows)} records")
 
+            self.remove_stale_chunks(output_file, len(chunks))
             print(f"  Created {len(chunks)} stock update files")
             return True
 
@@ -200,17 +315,108 @@ class PriceStockUpdater:
             print(f"Error creating stock update files: {e}")
             return False
 
-    def process_updates(self, product_data, base_prices):
-        """Process both price and stock updates"""
+    def remove_stale_chunks(self, output_file, chunk_count):
+        """Remove chunk files of output_file left by an earlier, larger run"""
+        prefix = output_file.replace('.xlsx', '_')
+        for path in sorted(glob.glob(f"{prefix}*.xlsx")):
+            chunk_number = path[len(prefix):-len('.xlsx')]
+            if chunk_number.isdigit() and int(chunk_number) > chunk_count:
+                os.remove(path)
+                print(f"  Removed stale chunk {path}")
+
+    def delta_outputs(self):
+        """
+        Get new, unused price and stock output names for a delta update set.
+
+        Delta sets are named by creation time (temu_price_update_20250101-093000.xlsx
+        gives temu_price_update_20250101-093000_1.xlsx, ...), so a later run never
+        overwrites or removes a set that may not have been uploaded yet.
+        """
+        set_id = datetime.now().strftime('%Y%m%d-%H%M%S')
+        suffix = ''
+        attempt = 1
+        while True:
+            outputs = [output.replace('.xlsx', f'_{set_id}{suffix}.xlsx') for output in (self.price_output, self.stock_output)]
+            if not any(glob.glob(output.replace('.xlsx', '_*.xlsx')) for output in outputs):
+                return outputs
+            attempt += 1
+            suffix = f'-{attempt}'
+
+    def split_chunks(self, joined, chunk_size=1000):
+        """Split matched product data into chunks of chunk_size records, keeping only rows with a SKU"""
+        chunks = []
+        for i in range(0, len(joined), chunk_size):
+            chunk_data = joined.iloc[i:i + chunk_size]
+            chunks.append(chunk_data[chunk_data['Has SKU']])
+        return chunks
+
+    def process_updates(self, product_data=None, base_prices=None, joined=None, full=False, write_prices=True):
+        """
+        Process both price and stock updates.
+
+        Both files are written from one join of the products against
+        PRICES.XLS. Pass joined (from join_products) to reuse a join made
+        earlier in the run; otherwise product_data['SKU'] is matched here.
+
+        By default only SKUs whose base price or quantity differs from what
+        was last published (see published_state.py) are written, as a new
+        timestamped set (see delta_outputs); earlier sets are left in place
+        and should be uploaded in order. full=True writes every SKU to
+        price_output / stock_output, replacing the previous full set. The
+        published state is updated once the files have been created. With
+        write_prices=False only the stock files are written (for quick
+        inventory syncs). The names used are kept in last_price_output and
+        last_stock_output; they are None for files that were not written,
+        e.g. a delta without price changes.
+        """
         print("\nProcessing price and stock updates from PRICES.XLS...")
 
-        success_price = self.create_price_update_file(product_data, base_prices)
-        success_stock = self.create_stock_update_file(product_data)
+        if joined is None:
+            joined = self.join_products(product_data['SKU'], base_prices)
+        joined = joined[joined['Has SKU']]
+        print(f"  Matched {int(joined['Matched'].sum())} of {len(joined)} SKUs in the price sources "
+              f"({SkuMatcher.describe(joined['Match Tier'])})")
+
+        state = PublishedState(self.published_state_db)
+        self.last_price_output = self.last_stock_output = None
+        if full:
+            print("  Full update: writing every SKU")
+            price_changes = stock_changes = joined
+            price_output, stock_output = self.price_output, self.stock_output
+        else:
+            price_changes = joined[state.changed_prices(joined['SKU'], joined['New base price'])] if write_prices else joined[:0]
+            stock_changes = joined[state.changed_quantities(joined['SKU'], joined['New quantity'])]
+            print(f"  Delta update: {len(price_changes)} price changes, {len(stock_changes)} stock changes "
+                  f"(of {len(joined)} SKUs)")
+            if price_changes.empty and stock_changes.empty:
+                print("  No price or stock changes, no files written")
+                return True
+            price_output, stock_output = self.delta_outputs()
+
+        # A delta set only gets the files that have changes
+        write_price = write_prices and (full or not price_changes.empty)
+        write_stock = full or not stock_changes.empty
+
+        success_price = True
+        if write_price:
+            success_price = self.create_price_update_file(price_changes, price_output)
+            if success_price:
+                self.last_price_output = price_output
+                state.record_prices(price_changes['SKU'], price_changes['New base price'])
+        success_stock = True
+        if write_stock:
+            success_stock = self.create_stock_update_file(stock_changes, stock_output)
+            if success_stock:
+                self.last_stock_output = stock_output
+                state.record_quantities(stock_changes['SKU'], stock_changes['New quantity'])
 
         if success_price and success_stock:
-            print("✅ Price and stock update files created successfully")
-            print(f"  Price files: {self.price_output} (chunked)")
-            print(f"  Stock files: {self.stock_output} (chunked)")
+            written = [kind for kind, output in (('Price', self.last_price_output), ('Stock', self.last_stock_output)) if output]
+            print(f"✅ {' and '.join(written).capitalize()} update files created successfully")
+            if self.last_price_output:
+                print(f"  Price files: {self.last_price_output} (chunked)")
+            if self.last_stock_output:
+                print(f"  Stock files: {self.last_stock_output} (chunked)")
         else:
             print("❌ Some update files failed to create")
 
@@ -236,7 +442,13 @@ def test_price_stock_updater():
         'Product Name': ['Test Product 1', 'Test Product 2', 'Test Product 3']
     })
 
-    updater.process_updates(test_data, test_base_prices)
+    # Write to a scratch directory so the real outputs and the published
+    # state (cache/published_state.sqlite) are left untouched
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        updater.price_output = os.path.join(scratch_dir, os.path.basename(updater.price_output))
+        updater.stock_output = os.path.join(scratch_dir, os.path.basename(updater.stock_output))
+        updater.published_state_db = os.path.join(scratch_dir, 'published_state.sqlite')
+        updater.process_updates(test_data, test_base_prices, full=True)
 
 if __name__ == "__main__":
     test_price_stock_updater() 
\ No newline at end of file
@@ -0,0 +1,143 @@
+"""
+Price Watcher Module for Faire2Temu
+
+Watches the price source files (PRICES.XLS, HBG.xlsx, ...) and calls back
+once a new or modified file has been completely written. The ERP replaces
+the files several times a day; this lets the price and stock update files
+follow without anyone starting a run.
+
+A change is only acted on once the size and modification time of every
+watched file have stayed the same for a settle period, so a file that is
+still being copied is never read half-written. Files whose content did not
+change (for example a re-copy of the same export) are skipped by comparing
+content hashes.
+
+The watcher polls with os.stat, so it needs no extra packages and also works
+on network shares where file system events are not delivered.
+
+Usage:
+    from price_watcher import PriceFileWatcher
+
+    watcher = PriceFileWatcher(['data/price/HBG.xlsx', 'data/price/PRICES.XLS'], on_change=publish_updates)
+    watcher.run()
+"""
+
+import os
+import time
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+from template_schema import file_hash
+
+DEFAULT_POLL_SECONDS = 5.0
+DEFAULT_SETTLE_SECONDS = 10.0
+
+
+class PriceFileWatcher:
+    """
+    Polls a set of price files and runs a callback for each completed change.
+    """
+
+    def __init__(self, prices_files: Union[str, Sequence[str]], on_change: Callable[[List[str]], bool],
+                 poll_seconds: float = DEFAULT_POLL_SECONDS,
+                 settle_seconds: float = DEFAULT_SETTLE_SECONDS):
+        """
+        Initialize the watcher.
+
+        Files present at startup count as new, so updates missed while the
+        watcher was not running are picked up on the first check.
+
+        Args:
+            prices_files: Path (or paths) of the price files to watch
+            on_change: Called with the paths whose content changed once the
+                files have settled; returns True when the updates were produced
+            poll_seconds: Seconds between checks of the files
+            settle_seconds: Seconds the files must stay unchanged before they are read
+        """
+        self.prices_files = [prices_files] if isinstance(prices_files, str) else list(prices_files)
+        self.on_change = on_change
+        self.poll_seconds = poll_seconds
+        self.settle_seconds = settle_seconds
+
+        self._seen_signature = None       # Last signature observed
+        self._stable_since = None         # When _seen_signature was first observed
+        self._handled_signature = None    # Signature of the last files handed to on_change
+        self._published_hashes = {}       # Content hash per file of the last successful processing
+
+    def signature(self) -> Optional[Tuple[Optional[Tuple[int, int]], ...]]:
+        """
+        Get the (size, modification time) of every watched file.
+
+        Missing or empty files have None; the whole signature is None when
+        no file is present.
+        """
+        signatures = []
+        for prices_file in self.prices_files:
+            try:
+                stat = os.stat(prices_file)
+            except OSError:
+                stat = None
+            signatures.append((stat.st_size, stat.st_mtime_ns) if stat is not None and stat.st_size else None)
+        if all(entry is None for entry in signatures):
+            return None
+        return tuple(signatures)
+
+    def poll(self) -> bool:
+        """
+        Check the price files once.
+
+        Returns:
+            True when on_change was called during this check
+        """
+        now = time.monotonic()
+        signature = self.signature()
+        if signature is None:
+            self._seen_signature = None
+            return False
+
+        if signature != self._seen_signature:
+            # New or still growing: wait for the files to settle
+            self._seen_signature = signature
+            self._stable_since = now
+        if now - self._stable_since < self.settle_seconds or signature == self._handled_signature:
+            return False
+
+        self._handled_signature = signature
+        content_hashes = {
+            prices_file: file_hash(prices_file) if entry is not None else None
+            for prices_file, entry in zip(self.prices_files, signature)
+        }
+        changed_files = [prices_file for prices_file in self.prices_files
+                         if content_hashes[prices_file] != self._published_hashes.get(prices_file)]
+        if not changed_files:
+            print(f"{', '.join(self.prices_files)} rewritten with the same content, nothing to do")
+            return False
+
+        print(f"Detected new price files: {', '.join(changed_files)}")
+        try:
+            success = self.on_change(changed_files)
+        except Exception as e:
+            print(f"❌ Error while processing {', '.join(changed_files)}: {e}")
+            success = False
+
+        # A failed change is retried only once a file changes again
+        if success:
+            self._published_hashes = content_hashes
+        return True
+
+    def run(self, max_checks: Optional[int] = None):
+        """
+        Poll the price files until interrupted.
+
+        Args:
+            max_checks: Stop after this many checks (None to run forever)
+        """
+        print(f"Watching {', '.join(self.prices_files)} (every {self.poll_seconds:g}s, settle {self.settle_seconds:g}s)")
+        checks = 0
+        try:
+            while max_checks is None or checks < max_checks:
+                self.poll()
+                checks += 1
+                if max_checks is None or checks < max_checks:
+                    time.sleep(self.poll_seconds)
+        except KeyboardInterrupt:
+            print("Stopped watching")
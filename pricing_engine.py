@@ -0,0 +1,133 @@
+"""
+Pricing Engine Module for Faire2Temu
+
+Computes Temu Base Price and List Price for a whole catalog in one pass.
+Each price is the Faire retail price times a multiplier, floored to whole
+dollars, minus one cent (X.99). All arithmetic after the multiplication is
+done in integer cents, so the results are exact cent amounts.
+
+Multipliers come from pricing tiers. A tier can be picked by SKU prefix
+(longest matching prefix wins) or by Temu category code; products matching
+neither use the default tier.
+
+Usage:
+    from pricing_engine import PricingEngine
+
+    engine = PricingEngine({'default': {'base': 1.0, 'list': 1.25},
+                            'sku_prefixes': {'HBG': {'base': 1.1, 'list': 1.4}}})
+    base_prices, list_prices = engine.compute(retail_prices, skus=skus)
+"""
+
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_TIER = {'base': 1.0, 'list': 1.25}
+
+
+class PricingEngine:
+    """
+    Vectorized base/list price calculation with configurable tiers.
+
+    The tier configuration is a dictionary with up to three keys:
+      - 'default': multipliers used when no other tier applies
+      - 'sku_prefixes': {prefix: multipliers} checked against the product SKU
+      - 'categories': {category code: multipliers} checked against the Temu category
+
+    Multipliers are given as {'base': float, 'list': float}. SKU prefix tiers
+    take precedence over category tiers.
+    """
+
+    def __init__(self, tiers: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the engine from a tier configuration.
+
+        Args:
+            tiers: Pricing tier configuration (None for the 1x / 1.25x default)
+        """
+        tiers = tiers or {}
+        self.default_tier = dict(DEFAULT_TIER, **tiers.get('default', {}))
+        self.prefix_tiers = {
+            prefix: dict(self.default_tier, **multipliers)
+            for prefix, multipliers in tiers.get('sku_prefixes', {}).items()
+        }
+        self.category_tiers = {
+            str(code): dict(self.default_tier, **multipliers)
+            for code, multipliers in tiers.get('categories', {}).items()
+        }
+
+    @property
+    def uses_categories(self) -> bool:
+        """Whether any tier depends on the Temu category code."""
+        return bool(self.category_tiers)
+
+    def multipliers(self, row_count: int, skus: Optional[Sequence] = None,
+                    category_codes: Optional[Sequence] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the base and list multiplier of every product.
+
+        Args:
+            row_count: Number of products
+            skus: Product SKUs (needed for SKU prefix tiers)
+            category_codes: Temu category codes (needed for category tiers)
+
+        Returns:
+            Tuple of (base multipliers, list multipliers) as float arrays
+        """
+        base = np.full(row_count, self.default_tier['base'], dtype=float)
+        list_ = np.full(row_count, self.default_tier['list'], dtype=float)
+        assigned = np.zeros(row_count, dtype=bool)
+
+        if self.prefix_tiers and skus is not None:
+            sku_series = pd.Series(skus, dtype=object).fillna('').astype(str)
+            # Longest prefix first, so more specific tiers win
+            for prefix in sorted(self.prefix_tiers, key=len, reverse=True):
+                mask = sku_series.str.startswith(prefix).to_numpy() & ~assigned
+                base[mask] = self.prefix_tiers[prefix]['base']
+                list_[mask] = self.prefix_tiers[prefix]['list']
+                assigned |= mask
+
+        if self.category_tiers and category_codes is not None:
+            code_array = pd.Series(category_codes, dtype=object).astype(str).to_numpy()
+            for code, tier in self.category_tiers.items():
+                mask = (code_array == code) & ~assigned
+                base[mask] = tier['base']
+                list_[mask] = tier['list']
+                assigned |= mask
+
+        return base, list_
+
+    def compute(self, retail_prices: Sequence, skus: Optional[Sequence] = None,
+                category_codes: Optional[Sequence] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compute Temu base and list prices for every product.
+
+        Base Price is the retail price times the base multiplier, floored,
+        minus one cent (at least 0.01). List Price is computed the same way
+        with the list multiplier and is always at least one cent above the
+        base price. Products without a valid retail price get NaN.
+
+        Args:
+            retail_prices: Faire retail prices (non-numeric values are invalid)
+            skus: Product SKUs (needed for SKU prefix tiers)
+            category_codes: Temu category codes (needed for category tiers)
+
+        Returns:
+            Tuple of (base prices, list prices) as float arrays in dollars
+        """
+        prices = pd.to_numeric(pd.Series(retail_prices, dtype=object), errors='coerce').to_numpy(dtype=float)
+        base_multipliers, list_multipliers = self.multipliers(len(prices), skus, category_codes)
+
+        valid = np.isfinite(prices)
+        safe_prices = np.where(valid, prices, 0.0)
+
+        # Whole dollars, then everything in integer cents
+        base_cents = np.floor(safe_prices * base_multipliers).astype(np.int64) * 100 - 1
+        base_cents = np.maximum(base_cents, 1)
+        list_cents = np.floor(safe_prices * list_multipliers).astype(np.int64) * 100 - 1
+        list_cents = np.maximum(list_cents, base_cents + 1)
+
+        base_prices = np.where(valid, base_cents / 100, np.nan)
+        list_prices = np.where(valid, list_cents / 100, np.nan)
+        return base_prices, list_prices
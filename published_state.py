@@ -0,0 +1,154 @@
+"""
+Published State Module for Faire2Temu
+
+Remembers the base price and quantity last published to Temu for each SKU,
+so the price and stock update files only need to contain SKUs whose value
+changed since the previous run.
+
+The state is kept in a small SQLite database (one row per SKU). Prices are
+compared in whole cents. A SKU that was never published counts as changed.
+Losing the database is harmless: the next run simply publishes every SKU
+again.
+
+Usage:
+    from published_state import PublishedState
+
+    state = PublishedState()
+    changed = state.changed_prices(skus, new_prices)
+    ...  # write the update files
+    state.record_prices(skus[changed], new_prices[changed])
+"""
+
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, Sequence
+
+import numpy as np
+import pandas as pd
+
+PUBLISHED_STATE_DB = 'cache/published_state.sqlite'
+
+
+class PublishedState:
+    """
+    SQLite snapshot of the last published price and quantity per SKU.
+    """
+
+    def __init__(self, db_path: str = PUBLISHED_STATE_DB):
+        """
+        Open (and create if needed) the published state database.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS published ("
+                " sku TEXT PRIMARY KEY,"
+                " price_cents INTEGER,"
+                " price_published_at TEXT,"
+                " quantity REAL,"
+                " quantity_published_at TEXT)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection that commits on success and is always closed."""
+        connection = sqlite3.connect(self.db_path)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def load(self) -> pd.DataFrame:
+        """
+        Get the published state of every SKU.
+
+        Returns:
+            DataFrame indexed by SKU with 'price_cents' and 'quantity' columns
+            (NaN where no value was published) and boolean 'price_published'
+            and 'quantity_published' columns
+        """
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT sku, price_cents, price_published_at IS NOT NULL,"
+                " quantity, quantity_published_at IS NOT NULL FROM published"
+            ).fetchall()
+        state = pd.DataFrame(rows, columns=['sku', 'price_cents', 'price_published', 'quantity', 'quantity_published'])
+        state[['price_cents', 'quantity']] = state[['price_cents', 'quantity']].astype(float)
+        state[['price_published', 'quantity_published']] = state[['price_published', 'quantity_published']].astype(bool)
+        return state.set_index('sku')
+
+    def changed_prices(self, skus: Sequence[str], prices: Sequence) -> np.ndarray:
+        """
+        Find the SKUs whose price differs from the published one.
+
+        Args:
+            skus: SKUs to check
+            prices: New base prices in dollars, aligned with skus (None/NaN for no price)
+
+        Returns:
+            Boolean array, True where the price changed or was never published
+        """
+        published = self.load().reindex(list(skus))
+        return _differs(to_cents(prices), published['price_cents'].to_numpy(),
+                        published['price_published'].fillna(False).to_numpy(dtype=bool))
+
+    def changed_quantities(self, skus: Sequence[str], quantities: Sequence) -> np.ndarray:
+        """
+        Find the SKUs whose quantity differs from the published one.
+
+        Args:
+            skus: SKUs to check
+            quantities: New quantities, aligned with skus
+
+        Returns:
+            Boolean array, True where the quantity changed or was never published
+        """
+        published = self.load().reindex(list(skus))
+        return _differs(to_numbers(quantities), published['quantity'].to_numpy(),
+                        published['quantity_published'].fillna(False).to_numpy(dtype=bool))
+
+    def record_prices(self, skus: Sequence[str], prices: Sequence):
+        """Store the base prices just published for these SKUs."""
+        cents = [None if np.isnan(value) else int(value) for value in to_cents(prices)]
+        self._record('price_cents', 'price_published_at', skus, cents)
+
+    def record_quantities(self, skus: Sequence[str], quantities: Sequence):
+        """Store the quantities just published for these SKUs."""
+        values = [None if np.isnan(value) else float(value) for value in to_numbers(quantities)]
+        self._record('quantity', 'quantity_published_at', skus, values)
+
+    def _record(self, column: str, timestamp_column: str, skus: Sequence[str], values: Sequence):
+        published_at = datetime.now().isoformat(timespec='seconds')
+        rows = [(str(sku), value, published_at) for sku, value in zip(skus, values)]
+        with self._connect() as connection:
+            connection.executemany(
+                f"INSERT INTO published (sku, {column}, {timestamp_column}) VALUES (?, ?, ?) "
+                f"ON CONFLICT(sku) DO UPDATE SET {column} = excluded.{column}, "
+                f"{timestamp_column} = excluded.{timestamp_column}",
+                rows
+            )
+
+
+def to_numbers(values: Sequence) -> np.ndarray:
+    """Convert values to a float array (NaN where a value is not a number)."""
+    return pd.to_numeric(pd.Series(list(values), dtype=object), errors='coerce').to_numpy(dtype=float)
+
+
+def to_cents(prices: Sequence) -> np.ndarray:
+    """Convert dollar prices to whole cents (NaN where there is no valid price)."""
+    return np.round(to_numbers(prices) * 100)
+
+
+def _differs(new: np.ndarray, published: np.ndarray, known: np.ndarray) -> np.ndarray:
+    """Compare new and published values; NaN equals NaN and unknown SKUs always differ."""
+    same = (new == published) | (np.isnan(new) & np.isnan(published))
+    return ~known | ~same
@@ -0,0 +1,116 @@
+"""
+SKU Matching Module for Faire2Temu
+
+Faire SKUs and ERP Item # values do not always agree character for
+character: case differs ('hbg104638' vs 'HBG104638'), cells carry stray
+spaces, numeric item numbers are read as floats, and some Faire SKUs carry
+an option suffix the ERP item does not. A SkuMatcher indexes the ERP item
+numbers once and matches SKUs in three tiers, each only for SKUs the
+previous tier left unmatched:
+
+  exact       trimmed text (whole-number floats as integer text)
+  normalized  upper case with all whitespace removed
+  base_goods  the SKU's Contribution Goods (option suffix removed) matched
+              against a normalized Item #, i.e. the variant falls back to
+              its parent item
+
+Every tier is a hash lookup on an index built once, so matching a whole
+catalog costs three vectorized get_indexer calls.
+
+Usage:
+    from sku_matching import SkuMatcher
+
+    matcher = SkuMatcher(prices_df['Item #'])
+    positions, tiers = matcher.match(skus)
+    print(matcher.describe(tiers))
+"""
+
+from typing import Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from price_sources import normalize_item_numbers
+
+# Match tiers in the order they are tried
+MATCH_TIERS = ('exact', 'normalized', 'base_goods')
+UNMATCHED = 'unmatched'
+
+
+def derive_contribution_goods(skus):
+    """Vectorized transform_sku_to_goods for a whole SKU column"""
+    skus = pd.Series(skus, dtype=object) if not isinstance(skus, pd.Series) else skus
+    missing = skus.isna() | (skus == '')
+    sku_str = skus.astype(str).str.strip()
+
+    # Remove a trailing 3-letter suffix, as transform_sku_to_goods does
+    has_suffix = (sku_str.str.len() > 3) & sku_str.str[-3:].str.isalpha()
+    goods = sku_str.where(~has_suffix, sku_str.str[:-3])
+    return goods.astype(object).where(~missing, '')
+
+
+def loose_keys(keys: pd.Series) -> pd.Series:
+    """Case- and whitespace-insensitive form of exact keys."""
+    return keys.str.upper().str.replace(r'\s+', '', regex=True)
+
+
+class SkuMatcher:
+    """
+    Tiered SKU lookup over a fixed list of item numbers.
+    """
+
+    def __init__(self, item_numbers: Sequence):
+        """
+        Index the item numbers for all match tiers.
+
+        Args:
+            item_numbers: ERP item numbers; a SKU's match is reported as a
+                position in this sequence (the first one when several match)
+        """
+        exact = normalize_item_numbers(item_numbers).reset_index(drop=True)
+        self.exact_index = self._first_positions(exact)
+        self.loose_index = self._first_positions(loose_keys(exact))
+
+    @staticmethod
+    def _first_positions(keys: pd.Series) -> pd.Series:
+        """Map each non-empty key to the position of its first occurrence."""
+        keys = keys[keys != '']
+        keys = keys[~keys.duplicated(keep='first')]
+        return pd.Series(keys.index.to_numpy(), index=pd.Index(keys.to_numpy(), dtype=object))
+
+    def match(self, skus: Sequence) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Match SKUs against the item numbers.
+
+        Args:
+            skus: SKUs to match
+
+        Returns:
+            Tuple of (positions, tiers): item number positions (-1 when
+            unmatched) and the tier name of every match ('unmatched' for none)
+        """
+        exact = normalize_item_numbers(skus).reset_index(drop=True)
+        candidates = {
+            'exact': (self.exact_index, exact),
+            'normalized': (self.loose_index, loose_keys(exact)),
+            'base_goods': (self.loose_index, loose_keys(derive_contribution_goods(exact))),
+        }
+
+        positions = np.full(len(exact), -1, dtype=np.int64)
+        tiers = np.full(len(exact), UNMATCHED, dtype=object)
+        for tier in MATCH_TIERS:
+            pending = np.flatnonzero(positions < 0)
+            if len(pending) == 0:
+                break
+            index, keys = candidates[tier]
+            found = index.index.get_indexer(keys.iloc[pending].tolist())
+            hit = (found >= 0) & (keys.iloc[pending].to_numpy() != '')
+            positions[pending[hit]] = index.to_numpy()[found[hit]]
+            tiers[pending[hit]] = tier
+        return positions, tiers
+
+    @staticmethod
+    def describe(tiers: Sequence) -> str:
+        """Summarize match tiers, e.g. 'exact 5151, normalized 8, base_goods 0, unmatched 92'."""
+        counts = pd.Series(list(tiers), dtype=object).value_counts()
+        return ', '.join(f"{tier} {int(counts.get(tier, 0))}" for tier in MATCH_TIERS + (UNMATCHED,))
@@ -0,0 +1,185 @@
+"""
+Template Pool Module for Faire2Temu
+
+Parsing a Temu template with openpyxl (validations, styles and all the help
+sheets) is the most expensive part of writing a chunk. This module parses each
+template workbook once per run and hands every chunk a workbook whose data
+rows have been reset to the pristine template contents, so nothing is
+re-read from disk.
+
+Usage:
+    from template_pool import TemplatePool
+
+    pool = TemplatePool()
+    for chunk_filename in chunk_filenames:
+        workbook = pool.checkout('data/temu_template.xlsx', 'Template', data_start_row=5)
+        ...  # write the chunk rows
+        workbook.save(chunk_filename)
+
+    # Or write a whole data region at once
+    rows = build_rows(pool.base_values('data/temu_template.xlsx', 'Template', data_start_row=5))
+    pool.fill('data/temu_template.xlsx', rows, 'Template', data_start_row=5).save(chunk_filename)
+"""
+
+from copy import copy
+from typing import Any, Dict, List, Optional, Tuple
+
+from openpyxl import load_workbook
+from openpyxl.cell.cell import Cell
+from openpyxl.workbook.workbook import Workbook
+
+
+class TemplatePool:
+    """
+    Keeps one parsed workbook per template and resets it between chunks.
+
+    Only the data region (rows at or below ``data_start_row``) of the target
+    sheet is ever written by the generators, so a checkout restores exactly
+    that region from a snapshot taken right after parsing. Every other part of
+    the workbook is left untouched and is therefore identical to a fresh load.
+
+    A checked-out workbook is shared: save it before the next checkout of the
+    same template.
+    """
+
+    def __init__(self):
+        """Initialize an empty pool."""
+        self._entries: Dict[Tuple[str, Optional[str], int], Dict] = {}
+
+    def checkout(self, template_file: str, sheet_name: Optional[str] = None,
+                 data_start_row: int = 2) -> Workbook:
+        """
+        Get a workbook in the pristine template state.
+
+        Args:
+            template_file: Path to the template workbook
+            sheet_name: Sheet whose data rows get written (None for the active sheet)
+            data_start_row: First row that chunk data is written to
+
+        Returns:
+            The pooled workbook with the data rows restored from the template
+        """
+        key = (template_file, sheet_name, data_start_row)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._load(template_file, sheet_name, data_start_row)
+            self._entries[key] = entry
+        else:
+            self._reset(entry, data_start_row)
+        return entry['workbook']
+
+    def base_values(self, template_file: str, sheet_name: Optional[str] = None,
+                    data_start_row: int = 2) -> Dict[int, Dict[int, Any]]:
+        """
+        Get the template's own values in the data region.
+
+        Args:
+            template_file: Path to the template workbook
+            sheet_name: Sheet whose data rows get written (None for the active sheet)
+            data_start_row: First row that chunk data is written to
+
+        Returns:
+            Non-empty template values keyed by row, then column
+        """
+        entry = self._entry(template_file, sheet_name, data_start_row)
+        rows: Dict[int, Dict[int, Any]] = {}
+        for (row, column), (value, _, _) in entry['pristine_cells'].items():
+            if value is not None:
+                rows.setdefault(row, {})[column] = value
+        return rows
+
+    def fill(self, template_file: str, rows: List[List[Any]], sheet_name: Optional[str] = None,
+             data_start_row: int = 2) -> Workbook:
+        """
+        Get the pooled workbook with its data region replaced by ``rows``.
+
+        All rows are emitted in one bulk append; the template's cell styles are
+        kept. Rows are expected to already contain the template's own values
+        (see ``base_values``), since every row in ``rows`` replaces the
+        template row it lands on.
+
+        Args:
+            template_file: Path to the template workbook
+            rows: Data rows in sheet order, one list of column values each (None = empty)
+            sheet_name: Sheet whose data rows get written (None for the active sheet)
+            data_start_row: Sheet row that receives the first entry of ``rows``
+
+        Returns:
+            The pooled workbook holding the new data region
+        """
+        entry = self._entry(template_file, sheet_name, data_start_row)
+        sheet = entry['sheet']
+        cells = sheet._cells
+
+        for key in [key for key in cells if key[0] >= data_start_row]:
+            del cells[key]
+
+        sheet._current_row = data_start_row - 1
+        for values in rows:
+            sheet.append({column: value for column, value in enumerate(values, 1) if value is not None})
+        last_row = sheet._current_row
+
+        # Put back template styles, and template values below the new rows
+        for (row, column), (value, data_type, style) in entry['pristine_cells'].items():
+            cell = cells.get((row, column))
+            if cell is None:
+                cell = Cell(sheet, row=row, column=column)
+                if row > last_row:
+                    cell._value = value
+                    cell.data_type = data_type
+                cells[(row, column)] = cell
+            cell._style = copy(style)
+
+        self._restore_outlines(entry)
+        return entry['workbook']
+
+    def _entry(self, template_file: str, sheet_name: Optional[str], data_start_row: int) -> Dict:
+        """Get the pool entry for a template, parsing it on first use."""
+        key = (template_file, sheet_name, data_start_row)
+        if key not in self._entries:
+            self._entries[key] = self._load(template_file, sheet_name, data_start_row)
+        return self._entries[key]
+
+    def _load(self, template_file: str, sheet_name: Optional[str], data_start_row: int) -> Dict:
+        """Parse a template and snapshot the data region of its target sheet."""
+        workbook = load_workbook(template_file)
+        sheet = workbook[sheet_name] if sheet_name else workbook.active
+
+        # Snapshot value and style of every cell in the data region
+        pristine_cells = {
+            (row, column): (cell._value, cell.data_type, copy(cell._style))
+            for (row, column), cell in sheet._cells.items()
+            if row >= data_start_row
+        }
+
+        # openpyxl records the column outline level while saving, so keep the
+        # parsed values to make every save match one from a fresh load
+        pristine_outlines = {ws.title: ws.column_dimensions.max_outline for ws in workbook.worksheets}
+
+        return {
+            'workbook': workbook,
+            'sheet': sheet,
+            'pristine_cells': pristine_cells,
+            'pristine_outlines': pristine_outlines,
+        }
+
+    def _reset(self, entry: Dict, data_start_row: int):
+        """Restore the data region of the pooled sheet to the template contents."""
+        sheet = entry['sheet']
+        cells = sheet._cells
+
+        for key in [key for key in cells if key[0] >= data_start_row]:
+            del cells[key]
+
+        for (row, column), (value, data_type, style) in entry['pristine_cells'].items():
+            cell = Cell(sheet, row=row, column=column, style_array=copy(style))
+            cell._value = value
+            cell.data_type = data_type
+            cells[(row, column)] = cell
+
+        self._restore_outlines(entry)
+
+    def _restore_outlines(self, entry: Dict):
+        """Undo the column outline levels recorded by the previous save."""
+        for ws in entry['workbook'].worksheets:
+            ws.column_dimensions.max_outline = entry['pristine_outlines'][ws.title]
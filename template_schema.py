@@ -0,0 +1,180 @@
+"""
+Template Schema Module for Faire2Temu
+
+This module builds a column index of the Temu template header row once per
+template file, so column lookups no longer rescan the worksheet for every
+mapping and every chunk. The index is persisted to disk keyed by the template
+file's content hash, so later runs (CLI or web app) skip parsing the workbook.
+
+Usage:
+    from template_schema import TemplateSchema
+
+    schema = TemplateSchema.load('data/temu_template.xlsx')
+    quantity_cols = schema.find_all('Quantity')                # exact match
+    image_cols = schema.find_all('SKU Images URL', exact=False)  # substring match
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+from openpyxl import load_workbook
+
+# Row 2 of the Template sheet holds the column headers
+HEADER_ROW = 2
+TEMPLATE_SHEET = 'Template'
+SCHEMA_CACHE_DIR = 'cache/template_schema'
+
+# Bump when the cached JSON layout changes so stale caches are ignored
+SCHEMA_VERSION = 1
+
+
+def file_hash(path: str) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class TemplateSchema:
+    """
+    Column index for the header row of a Temu template sheet.
+
+    Maps every header to all of the (1-based) column indices where it appears.
+    Lookups support exact matching (``header == name``) and substring matching
+    (``name in header``), mirroring the two styles used by the mapping code.
+    """
+
+    def __init__(self, headers: List[str], template_hash: str = ''):
+        """
+        Build the index from a list of header strings.
+
+        Args:
+            headers: Header values in column order (index 0 is column 1)
+            template_hash: Content hash of the template file the headers came from
+        """
+        self.headers = headers
+        self.template_hash = template_hash
+        self.columns: Dict[str, List[int]] = {}
+        for col_idx, header in enumerate(headers, 1):
+            self.columns.setdefault(header, []).append(col_idx)
+        self._substring_matches: Dict[str, List[int]] = {}
+
+    @property
+    def max_column(self) -> int:
+        """Number of columns in the header row."""
+        return len(self.headers)
+
+    def find_all(self, name: str, exact: bool = True) -> List[int]:
+        """
+        Get every column index whose header matches the given name.
+
+        Args:
+            name: Header name to look for
+            exact: If True match the header exactly, otherwise match any header
+                   containing ``name``
+
+        Returns:
+            List of 1-based column indices in column order (empty if none)
+        """
+        if exact:
+            return list(self.columns.get(name, []))
+
+        if name not in self._substring_matches:
+            self._substring_matches[name] = [
+                col_idx for col_idx, header in enumerate(self.headers, 1) if name in header
+            ]
+        return list(self._substring_matches[name])
+
+    def find(self, name: str, exact: bool = True) -> Optional[int]:
+        """
+        Get the first column index whose header matches the given name.
+
+        Args:
+            name: Header name to look for
+            exact: If True match the header exactly, otherwise match any header
+                   containing ``name``
+
+        Returns:
+            1-based column index, or None if no header matches
+        """
+        matches = self.find_all(name, exact)
+        return matches[0] if matches else None
+
+    def to_dict(self) -> Dict:
+        """Serialize the schema for the on-disk cache."""
+        return {
+            'version': SCHEMA_VERSION,
+            'template_hash': self.template_hash,
+            'headers': self.headers,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'TemplateSchema':
+        """Rebuild a schema from its cached dictionary form."""
+        return cls(data['headers'], data.get('template_hash', ''))
+
+    @classmethod
+    def from_template(cls, template_file: str, template_hash: str = '') -> 'TemplateSchema':
+        """
+        Parse the header row of a template workbook.
+
+        Args:
+            template_file: Path to the Temu template (.xlsx)
+            template_hash: Optional precomputed content hash of the file
+
+        Returns:
+            TemplateSchema for the template's Template sheet
+        """
+        workbook = load_workbook(template_file, read_only=True)
+        try:
+            sheet = workbook[TEMPLATE_SHEET]
+            header_cells = next(sheet.iter_rows(min_row=HEADER_ROW, max_row=HEADER_ROW, values_only=True))
+            # str() keeps the legacy matching behaviour (empty headers become 'None')
+            headers = [str(value) for value in header_cells]
+        finally:
+            workbook.close()
+        return cls(headers, template_hash)
+
+    @classmethod
+    def load(cls, template_file: str, cache_dir: str = SCHEMA_CACHE_DIR) -> 'TemplateSchema':
+        """
+        Load the schema for a template, using the on-disk cache when possible.
+
+        The cache entry is keyed by the template's content hash, so replacing
+        the template file automatically triggers a rebuild.
+
+        Args:
+            template_file: Path to the Temu template (.xlsx)
+            cache_dir: Directory holding cached schemas
+
+        Returns:
+            TemplateSchema for the template
+        """
+        template_hash = file_hash(template_file)
+        cache_file = os.path.join(cache_dir, f"{template_hash}.json")
+
+        if os.path.exists(cache_file):
+            try:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == SCHEMA_VERSION and data.get('template_hash') == template_hash:
+                    return cls.from_dict(data)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Warning: Ignoring unreadable template schema cache {cache_file}: {e}")
+
+        schema = cls.from_template(template_file, template_hash)
+
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_file = f"{cache_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(schema.to_dict(), f)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            print(f"Warning: Could not write template schema cache {cache_file}: {e}")
+
+        return schema
@@ -0,0 +1,109 @@
+import json
+import os
+
+import pandas as pd
+
+from category_assigner import CategoryAssigner, CategoryRuleFile, KeywordRuleMatcher
+
+TRICKY_NAMES = [
+    "Women's Leather Belt",
+    'Ladies Pendant Necklace',           # 'pen' inside 'pendant'
+    'Bath Towel Wrap',                   # 'bath' and 'bath towel' start at the same place
+    'Spa Hand Tool Set',                 # matched by several rules, the first one wins
+    'Pen Case for School',
+    'Tote Bag',
+    'Random Product',
+]
+
+
+def _matches_rule(product_name, rule):
+    """Reference check: every keyword group needs at least one keyword in the name."""
+    return all(any(word in product_name for word in group) for group in rule['keywords'])
+
+
+def test_compiled_rules_match_rule_order():
+    """Test that the compiled matcher picks the first rule the keyword scans would pick."""
+    assigner = CategoryAssigner()
+
+    for name in TRICKY_NAMES:
+        normalized_name = name.lower()
+        expected = next((rule['category_code'] for rule in assigner.category_rules
+                         if _matches_rule(normalized_name, rule)), assigner.default_category)
+        assert assigner.determine_category(name) == expected, name
+
+    assert assigner.determine_category('Spa Hand Tool Set') == '19843'
+    assert assigner.determine_category('') == assigner.default_category
+
+
+def test_batch_classifies_each_name_once():
+    """Test that determine_categories matches determine_category and reuses results per name."""
+    assigner = CategoryAssigner()
+    names = pd.Series(['Tote Bag', 'TOTE BAG', None, 'Ladies Pendant Necklace', 'Tote Bag'], index=[7, 8, 9, 10, 11])
+    calls = []
+    classify = assigner.determine_category
+    assigner.determine_category = lambda name, image=None: calls.append(name) or classify(name, image)
+
+    codes = assigner.determine_categories(names)
+
+    assert codes.index.tolist() == [7, 8, 9, 10, 11]
+    assert codes.tolist() == [classify('Tote Bag'), classify('Tote Bag'), assigner.default_category,
+                              classify('Ladies Pendant Necklace'), classify('Tote Bag')]
+    assert calls == ['Tote Bag', 'Ladies Pendant Necklace']
+    assert assigner.count_categories(codes)['Products'].tolist() == [3, 1, 1]
+
+
+def test_only_rules_sharing_a_keyword_are_candidates():
+    """Test that the keyword index limits evaluation to rules with a keyword in the name."""
+    rules = [{'category_code': str(code), 'keywords': [[f'item{code}x'], [f'kind{code}x']]} for code in range(500)]
+    rules.append({'category_code': 'pen', 'keywords': [['pen']]})
+    matcher = KeywordRuleMatcher(rules)
+
+    _, candidates = matcher.scan('pendant item42x kind7x')
+
+    assert candidates == {7, 42, 500}
+    assert matcher.first_match('pendant item42x kind7x')['category_code'] == 'pen'
+    assert matcher.first_match('item42x kind42x pendant')['category_code'] == '42'
+    assert matcher.first_match('item42x kind7x') is None
+
+
+def _write_rules(path, rules, mtime_ns):
+    path.write_text(json.dumps({'version': 1, 'default_category': '1', 'rules': rules}))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_rule_file_reloads_only_when_changed(tmp_path):
+    """Test that the rule file is recompiled on change and a broken edit keeps the last good rules."""
+    rules_path = tmp_path / 'rules.json'
+    _write_rules(rules_path, [{'category_code': '2', 'description': 'Totes', 'keywords': [['Tote']]}], 10**18)
+    rule_file = CategoryRuleFile(str(rules_path), str(tmp_path / 'cache'))
+
+    first = rule_file.load()
+    assert first.rules[0]['keywords'] == [['tote']]
+    assert first.matcher.first_match('tote bag')['category_code'] == '2'
+    assert rule_file.load() is first
+
+    _write_rules(rules_path, [{'category_code': '3', 'description': 'Bags', 'keywords': [['bag']]}], 2 * 10**18)
+    second = rule_file.load()
+    assert second.matcher.first_match('tote bag')['category_code'] == '3'
+
+    rules_path.write_text('{"rules": [{"category_code": "4", "keywords": []}]}')
+    assert rule_file.load() is second
+
+    # Warm start: a new instance reuses the compiled rules cached for the same content
+    _write_rules(rules_path, [{'category_code': '2', 'description': 'Totes', 'keywords': [['Tote']]}], 3 * 10**18)
+    warm = CategoryRuleFile(str(rules_path), str(tmp_path / 'cache')).load()
+    assert warm.rules == first.rules and warm.rules_hash == first.rules_hash
+    assert len(os.listdir(tmp_path / 'cache')) == 2
+
+
+def test_tracing_is_opt_in_and_sampled(capsys):
+    """Test that classification prints nothing by default and DEBUG lines for a sample when enabled."""
+    names = pd.Series([f'Tote Bag {number}' for number in range(1000)])
+
+    CategoryAssigner().determine_categories(names)
+    assert 'DEBUG' not in capsys.readouterr().out
+
+    CategoryAssigner(trace_rate=0.05).determine_categories(names)
+    lines = [line for line in capsys.readouterr().out.splitlines() if line.startswith('DEBUG')]
+    assert 10 < len(lines) < 100
+    assert "matched keyword 'tote' -> Category 29163" in lines[0]
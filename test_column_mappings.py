@@ -0,0 +1,69 @@
+import pandas as pd
+
+from Faire2Temu import apply_column_mappings, assign_variants, select_image_urls
+from template_schema import TemplateSchema
+
+TEMPLATE_FILE = 'data/temu_template.xlsx'
+
+
+def test_apply_column_mappings():
+    """Test transformations, defaults and the missing values report on a small catalog."""
+    data_df = pd.DataFrame({
+        'SKU': ['HBG1', 'HBG2', None],
+        'Product Name (English)': ['  Tote Bag ', None, 'Hat'],
+        'On Hand Inventory': [5, None, 2],
+        'Item Weight': [1.5, '', None],
+    }, index=[10, 11, 12])
+
+    mapped_df, defaults_df, missing_values_df = apply_column_mappings(data_df, TemplateSchema.load(TEMPLATE_FILE))
+
+    assert mapped_df['Product Name (English)'].tolist() == ['Tote Bag', '', 'Hat']
+    assert mapped_df['On Hand Inventory'].tolist() == [5, '', 2]
+    assert mapped_df['Item Weight'].tolist() == [1.5, 0.88, 0.88]
+    assert defaults_df['Item Weight'].tolist() == [False, True, True]
+    assert missing_values_df.index.tolist() == [11, 12]
+    assert missing_values_df['SKU'].tolist() == ['HBG2', 'Unknown']
+    assert set(missing_values_df['MissingValue']) == {'Weight - lb'}
+
+
+def test_assign_variants_numbers_whole_catalog():
+    """Test that colorless variants are numbered per Contribution Goods across the catalog."""
+    data_df = pd.DataFrame({
+        'SKU': ['HBG100ABC', 'HBG100XYZ', 'HBG200', 'HBG100RED', None],
+        'Option 1 Value': [None, '', None, 'Red', None],
+    })
+
+    variants_df = assign_variants(data_df)
+
+    assert variants_df['Contribution Goods'].tolist() == ['HBG100', 'HBG100', 'HBG200', 'HBG100', '']
+    assert variants_df['Color'].tolist() == ['Color 1', 'Color 2', 'One Color', None, 'One Color']
+    assert variants_df['Variation Theme'].tolist() == ['Color', 'Color', 'Color', None, 'Color']
+
+
+def test_select_image_urls_prefers_option_image():
+    """Test image source selection and splitting into the URL matrix."""
+    data_df = pd.DataFrame({
+        'Product Images': ['p1.jpg, p2.jpg', 'p3.jpg', None, ' , '],
+        'Option Image': ['o1.jpg', '  ', None, None],
+    })
+
+    images_df = select_image_urls(data_df)
+
+    assert images_df['Image Source'].fillna('none').tolist() == ['Option Image', 'Product Images', 'none', 'Product Images']
+    assert images_df.iloc[0, 1:].tolist() == ['o1.jpg']
+    assert images_df.iloc[1, 1:].tolist() == ['p3.jpg']
+    assert images_df.iloc[2:, 1:].isna().all().all()
+
+
+def test_select_image_urls_without_urls():
+    """Test that catalogs without products or without image URLs give only the 'Image Source' column."""
+    empty_df = pd.DataFrame({'Product Images': pd.Series([], dtype=object)})
+    no_images_df = pd.DataFrame({'Product Images': [None, ' '], 'Option Image': [None, None]}, index=[5, 9])
+
+    empty_images = select_image_urls(empty_df)
+    no_images = select_image_urls(no_images_df)
+
+    assert empty_images.columns.tolist() == ['Image Source'] and empty_images.empty
+    assert no_images.columns.tolist() == ['Image Source']
+    assert no_images.index.tolist() == [5, 9]
+    assert no_images['Image Source'].isna().all()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+
+import pandas as pd
+
+import faire_ingest
+from faire_ingest import read_faire_catalog, read_faire_products
+
+
+def test_second_read_skips_excel(monkeypatch):
+    """Test that a repeated read of the same export is served from the cache."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        export_file = os.path.join(tmp_dir, 'faire_products.xlsx')
+        cache_dir = os.path.join(tmp_dir, 'cache')
+        pd.DataFrame({
+            'SKU': ['Instructions', 'HBG1', 'HBG2'],
+            'On Hand Inventory': ['Enter a number', 3, None],
+        }).to_excel(export_file, sheet_name='Products', index=False)
+
+        first = read_faire_products(export_file, cache_dir=cache_dir)
+        assert os.listdir(cache_dir)
+
+        def fail_read_excel(*args, **kwargs):
+            raise AssertionError('Excel file parsed again')
+
+        monkeypatch.setattr(faire_ingest.pd, 'read_excel', fail_read_excel)
+        second = read_faire_products(export_file, cache_dir=cache_dir)
+        pd.testing.assert_frame_equal(first, second)
+        assert second['On Hand Inventory'].tolist()[:2] == ['Enter a number', 3]
+
+
+def test_catalog_read_is_pruned_and_typed():
+    """Test that the catalog read drops instruction rows and unused columns and sets dtypes."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        export_file = os.path.join(tmp_dir, 'faire_products.xlsx')
+        pd.DataFrame({
+            'SKU': ['Your SKU', 'Required', 'e.g. ABC1', 12345, 'HBG2'],
+            'Brand': ['', '', '', 'Nima', 'Nima'],
+            'Option Image': ['URL', '', '', 'a.jpg', None],
+            'On Hand Inventory': ['Number', '', '', 3, 'n/a'],
+        }).to_excel(export_file, sheet_name='Products', index=False)
+
+        catalog_df = read_faire_catalog(['SKU', 'On Hand Inventory'], column_keywords=['Image'],
+                                        faire_file=export_file, cache_dir=os.path.join(tmp_dir, 'cache'))
+
+        assert list(catalog_df.columns) == ['SKU', 'Option Image', 'On Hand Inventory']
+        assert catalog_df['SKU'].tolist() == ['12345', 'HBG2']
+        assert catalog_df['On Hand Inventory'].tolist()[0] == 3
+        assert pd.isna(catalog_df['On Hand Inventory'].tolist()[1])
+
+
+def test_missing_sku_stays_missing():
+    """Test that a product without SKU keeps a missing value instead of the text 'nan'."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        export_file = os.path.join(tmp_dir, 'faire_products.xlsx')
+        pd.DataFrame({
+            'SKU': ['Your SKU', 'Required', 'e.g. ABC1', 'HBG1', None],
+            'Product Name (English)': ['', '', '', 'Tote', 'Wallet'],
+        }).to_excel(export_file, sheet_name='Products', index=False)
+
+        catalog_df = read_faire_catalog(['SKU', 'Product Name (English)'], faire_file=export_file,
+                                        cache_dir=os.path.join(tmp_dir, 'cache'))
+
+        assert catalog_df['SKU'].tolist()[0] == 'HBG1'
+        assert pd.isna(catalog_df['SKU'].tolist()[1])
@@ -0,0 +1,132 @@
+import os
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from price_sources import PriceSourceRegistry, merge_sources
+from price_stock_updater import PriceStockUpdater, is_delta_update_file, normalize_item_numbers
+from template_pool import TemplatePool
+
+
+def _updater(prices_df):
+    """Build an updater over an in-memory price table instead of PRICES.XLS."""
+    updater = PriceStockUpdater.__new__(PriceStockUpdater)
+    updater.prices_df = prices_df
+    updater.build_index()
+    return updater
+
+
+def test_lookup_many_aligns_with_skus():
+    """Test batch lookups: normalized keys, first record wins, misses get NaN / 0."""
+    updater = _updater(pd.DataFrame({
+        'Item #': ['HBG104955G', ' HBG200 ', 12345.0, 'HBG104955G'],
+        'On-hand Qty': [318, 5, 2, 99],
+        'Sale Price': [4.0, np.nan, 7.5, 1.0],
+    }))
+
+    prices, stock, found = updater.lookup_many(['HBG200', 'missing', '12345', 'HBG104955G'])
+
+    assert found.tolist() == [True, False, True, True]
+    np.testing.assert_array_equal(stock, [5, 0, 2, 318])
+    np.testing.assert_array_equal(prices, [np.nan, np.nan, 7.5, 4.0])
+    assert updater.get_price_for_sku('HBG104955G') == 4.0
+    assert updater.get_stock_for_sku('missing') == 0
+    assert normalize_item_numbers([' A1 ', 12345.0, None]).tolist() == ['A1', '12345', '']
+
+
+def test_join_products_fills_fallbacks():
+    """Test that one join gives new prices / quantities with base price and 0 stock fallbacks."""
+    updater = _updater(pd.DataFrame({
+        'Item #': ['A1', 'B2'],
+        'On-hand Qty': [3, 8],
+        'Sale Price': [5.99, np.nan],
+    }))
+    skus = pd.Series(['B2', 'A1', 'C3', ''], index=[10, 11, 12, 13])
+
+    joined = updater.join_products(skus, [9.99, 4.99, 2.99, None])
+
+    assert joined.index.tolist() == [10, 11, 12, 13]
+    assert joined['Matched'].tolist() == [True, True, False, False]
+    assert joined['Has SKU'].tolist() == [True, True, True, False]
+    assert joined['New base price'].tolist()[:3] == [9.99, 5.99, 2.99]
+    assert joined['New quantity'].tolist() == [8, 3, 0, 0]
+
+
+def test_price_sources_merge_by_precedence():
+    """Test that the first source with a value wins per field and records its provenance."""
+    specific = pd.DataFrame({'Item #': ['A1', 'B2'], 'Sale Price': [4.99, np.nan]})
+    general = pd.DataFrame({'Item #': ['B2', 'A1', 'C3'], 'Sale Price': [6.0, 5.0, 7.0], 'On-hand Qty': [1, 2, 3]})
+    updater = _updater(merge_sources([('HBG', specific), ('PRICES', general)]))
+
+    assert updater.resolve('A1') == {'Sale Price': 4.99, 'Sale Price Source': 'HBG',
+                                     'On-hand Qty': 2.0, 'On-hand Qty Source': 'PRICES'}
+    assert updater.resolve('B2')['Sale Price Source'] == 'PRICES'
+    assert updater.resolve('missing') is None
+
+    joined = updater.join_products(pd.Series(['C3', 'A1']), [1.0, 1.0])
+    assert joined['New base price'].tolist() == [7.0, 4.99]
+    assert joined['Sale Price Source'].tolist() == ['PRICES', 'HBG']
+
+
+def test_delta_runs_keep_earlier_sets(tmp_path):
+    """Test that consecutive delta runs write separate sets and never remove an earlier one."""
+    updater = _updater(pd.DataFrame({'Item #': ['A1', 'B2'], 'On-hand Qty': [3, 8], 'Sale Price': [5.99, 2.5]}))
+    updater.template_pool = TemplatePool()
+    updater.price_template = 'data/temu_price_template.xlsx'
+    updater.stock_template = 'data/temu_stock_template.xlsx'
+    updater.price_output = str(tmp_path / 'temu_price_update.xlsx')
+    updater.stock_output = str(tmp_path / 'temu_stock_update.xlsx')
+    updater.published_state_db = str(tmp_path / 'state.sqlite')
+    skus = pd.Series(['A1', 'B2'])
+
+    assert updater.process_updates(joined=updater.join_products(skus, [9.99, 4.99]))
+    first_set = sorted(os.listdir(tmp_path))
+
+    # Nothing changed: no new files and the pending first set stays
+    assert updater.process_updates(joined=updater.join_products(skus, [9.99, 4.99]))
+    assert sorted(os.listdir(tmp_path)) == first_set
+    assert updater.last_price_output is None and updater.last_stock_output is None
+
+    updater.prices_df.loc[0, 'On-hand Qty'] = 0
+    updater.build_index()
+    assert updater.process_updates(joined=updater.join_products(skus, [9.99, 4.99]))
+    second_set = sorted(set(os.listdir(tmp_path)) - set(first_set))
+    assert set(first_set) <= set(os.listdir(tmp_path))
+    assert second_set == [os.path.basename(updater.last_stock_output).replace('.xlsx', '_1.xlsx')]
+    assert updater.last_price_output is None  # no price changes, no price files
+    assert load_workbook(tmp_path / second_set[0]).active['A3'].value == 'A1'
+
+
+def test_no_price_data_after_failed_load():
+    """Test that a failed price source load is reported as having no price data."""
+    updater = PriceStockUpdater([{'name': 'PRICES', 'file': 'missing/PRICES.XLS', 'sheet': 'Sheet1', 'header': 5,
+                                  'columns': {'Item #': 'Item #'}, 'required': True}])
+
+    assert not updater.has_price_data()
+    assert _updater(pd.DataFrame({'Item #': ['A1'], 'On-hand Qty': [1], 'Sale Price': [2.0]})).has_price_data()
+
+
+def test_delta_sets_are_recognized_for_cleanup():
+    """Test the file names the web app keeps when it clears output/ before a run."""
+    assert is_delta_update_file('output/temu_stock_update_20250101-093000_1.xlsx')
+    assert is_delta_update_file('temu_price_update_20250101-093000-2_12.xlsx')
+    assert not is_delta_update_file('output/temu_stock_update_1.xlsx')
+    assert not is_delta_update_file('temu_template_other_1.xlsx')
+
+
+def test_source_cache_follows_configuration(tmp_path):
+    """Test that changing a source's columns rereads the file instead of serving the cached snapshot."""
+    prices_file = tmp_path / 'PRICES.xlsx'
+    pd.DataFrame({'Item #': ['A1'], 'Sale Price': [5.0], 'List Price': [9.0]}).to_excel(
+        prices_file, sheet_name='Sheet1', index=False)
+    source = {'name': 'PRICES', 'file': str(prices_file), 'sheet': 'Sheet1', 'header': 0,
+              'columns': {'Item #': 'Item #', 'Sale Price': 'Sale Price'}}
+    registry = PriceSourceRegistry([source], cache_dir=str(tmp_path / 'cache'))
+
+    assert registry.load()['Sale Price'].tolist() == [5.0]
+    registry.load()
+    assert registry.load_stats['PRICES']['origin'] == 'cache'
+    source['columns'] = {'Item #': 'Item #', 'List Price': 'Sale Price'}
+    assert registry.load()['Sale Price'].tolist() == [9.0]
+    assert registry.load_stats['PRICES']['origin'] == 'file'
@@ -0,0 +1,55 @@
+import os
+import tempfile
+
+from price_watcher import PriceFileWatcher
+
+
+def test_runs_once_per_settled_change():
+    """Test that the callback runs for new content only, after the file settles."""
+    with tempfile.TemporaryDirectory() as price_dir:
+        prices_file = os.path.join(price_dir, 'PRICES.XLS')
+        calls = []
+        watcher = PriceFileWatcher(prices_file, lambda path: calls.append(path) or True, settle_seconds=0)
+
+        assert not watcher.poll()  # no file yet
+        with open(prices_file, 'wb') as f:
+            f.write(b'first export')
+        assert watcher.poll()
+        assert not watcher.poll()  # unchanged
+
+        # Same content written again: nothing to publish
+        with open(prices_file, 'wb') as f:
+            f.write(b'first export')
+        os.utime(prices_file, ns=(1, 1))
+        assert not watcher.poll()
+
+        with open(prices_file, 'wb') as f:
+            f.write(b'second export')
+        assert watcher.poll()
+        assert calls == [[prices_file], [prices_file]]
+
+        # A change that has not settled yet is not read
+        watcher.settle_seconds = 60
+        with open(prices_file, 'wb') as f:
+            f.write(b'partial')
+        assert not watcher.poll()
+
+
+def test_change_to_any_price_source_triggers():
+    """Test that a change to HBG.xlsx alone triggers the callback when several sources are watched."""
+    with tempfile.TemporaryDirectory() as price_dir:
+        hbg_file = os.path.join(price_dir, 'HBG.xlsx')
+        prices_file = os.path.join(price_dir, 'PRICES.XLS')
+        with open(prices_file, 'wb') as f:
+            f.write(b'prices export')
+        calls = []
+        watcher = PriceFileWatcher([hbg_file, prices_file], lambda paths: calls.append(paths) or True,
+                                   settle_seconds=0)
+
+        assert watcher.poll()  # PRICES.XLS present at startup, HBG.xlsx missing
+        assert not watcher.poll()
+
+        with open(hbg_file, 'wb') as f:
+            f.write(b'handbag prices')
+        assert watcher.poll()
+        assert calls == [[prices_file], [hbg_file]]
@@ -0,0 +1,36 @@
+import math
+
+import numpy as np
+
+from pricing_engine import PricingEngine
+
+
+def test_default_tier_matches_floor_pricing():
+    """Test that the default tier reproduces the 1x / 1.25x floored X.99 prices."""
+    prices = [19.99, 24.5, 0.5, 3.2, 100]
+    base, list_ = PricingEngine().compute(prices)
+
+    for price, base_price, list_price in zip(prices, base, list_):
+        expected_base = max(0.01, math.floor(price) - 0.01)
+        expected_list = max(round(expected_base + 0.01, 2), math.floor(price * 1.25) - 0.01)
+        assert base_price == expected_base
+        assert list_price == expected_list
+
+
+def test_invalid_prices_are_nan():
+    """Test that missing and non-numeric prices get no price."""
+    base, list_ = PricingEngine().compute([None, '', 'n/a', '12'])
+    assert np.isnan(base[:3]).all() and np.isnan(list_[:3]).all()
+    assert base[3] == 11.99 and list_[3] == 14.99
+
+
+def test_tiers_by_prefix_and_category():
+    """Test that SKU prefix tiers win over category tiers, which win over the default."""
+    engine = PricingEngine({
+        'sku_prefixes': {'HB': {'list': 1.5}, 'HBG': {'base': 2.0, 'list': 3.0}},
+        'categories': {'29153': {'list': 2.0}},
+    })
+    base, list_ = engine.compute([10, 10, 10, 10], skus=['HBG1', 'HB1', 'CAP1', 'CAP2'],
+                                 category_codes=['29153', '29153', '29153', '1'])
+    assert base.tolist() == [19.99, 9.99, 9.99, 9.99]
+    assert list_.tolist() == [29.99, 14.99, 19.99, 11.99]
@@ -0,0 +1,23 @@
+import os
+import tempfile
+
+from published_state import PublishedState
+
+
+def test_only_changed_values_are_reported():
+    """Test that prices / quantities count as changed until the same value was published."""
+    with tempfile.TemporaryDirectory() as state_dir:
+        state = PublishedState(os.path.join(state_dir, 'state.sqlite'))
+        skus = ['A1', 'B2', 'C3']
+
+        assert state.changed_prices(skus, [5.99, None, 7.0]).tolist() == [True, True, True]
+        state.record_prices(skus, [5.99, None, 7.0])
+        state.record_quantities(['A1'], [3])
+
+        # Same price in whole cents, "no price" again, new price
+        assert state.changed_prices(skus, [5.990000001, float('nan'), 7.5]).tolist() == [False, False, True]
+        # Quantities were only published for A1
+        assert state.changed_quantities(skus, [3, 0, 0]).tolist() == [False, True, True]
+
+        # The state survives reopening the database
+        assert PublishedState(state.db_path).changed_quantities(['A1'], [4]).tolist() == [True]
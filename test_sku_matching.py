@@ -0,0 +1,12 @@
+from sku_matching import SkuMatcher
+
+
+def test_tiers_are_tried_in_order():
+    """Test exact, then case/space-insensitive, then base goods matching."""
+    matcher = SkuMatcher(['HBG104955G', 'hbg104638', 'HBG103787', 12345.0, 'hbg104955g'])
+
+    positions, tiers = matcher.match(['HBG104955G', 'HBG 104638', 'HBG103787BEI', '12345', 'HBG999', ''])
+
+    assert positions.tolist() == [0, 1, 2, 3, -1, -1]
+    assert tiers.tolist() == ['exact', 'normalized', 'base_goods', 'exact', 'unmatched', 'unmatched']
+    assert SkuMatcher.describe(tiers) == 'exact 2, normalized 1, base_goods 1, unmatched 2'
@@ -3,12 +3,14 @@ import re
 import sys
 import argparse
 
+from faire_ingest import read_faire_products
+
 def test_baseline_output():
     """Test the baseline tool output to verify data was copied correctly."""
     
     try:
         # Load the original Faire file to get source data
-        faire_df = pd.read_excel('data/faire_products.xlsx', sheet_name='Products')
+        faire_df = read_faire_products('data/faire_products.xlsx', sheet_name='Products')
         product_name_col = None
         for col in faire_df.columns:
             if 'Product Name (English)' in str(col):
@@ -305,7 +307,7 @@ def test_image_processing():
 def show_available_columns():
     """Show available columns in both files for reference."""
     try:
-        faire_df = pd.read_excel('data/faire_products.xlsx', sheet_name='Products')
+        faire_df = read_faire_products('data/faire_products.xlsx', sheet_name='Products')
         temu_df = pd.read_excel('data/temu_template.xlsx', sheet_name='Template', header=1)
         
         print("AVAILABLE COLUMNS FOR MAPPING")
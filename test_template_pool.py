@@ -0,0 +1,58 @@
+import io
+import zipfile
+
+from template_pool import TemplatePool
+
+TEMPLATE_FILE = 'data/temu_template.xlsx'
+
+
+def _saved_members(workbook):
+    """Save a workbook to memory and return its zip members (minus timestamps)."""
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    archive = zipfile.ZipFile(buffer)
+    return {name: archive.read(name) for name in archive.namelist() if name != 'docProps/core.xml'}
+
+
+def test_checkout_restores_template():
+    """Test that every checkout starts from the pristine template contents."""
+    pool = TemplatePool()
+
+    workbook = pool.checkout(TEMPLATE_FILE, 'Template', data_start_row=5)
+    pristine = _saved_members(workbook)
+    example_name = workbook['Template'].cell(row=5, column=6).value
+
+    # Dirty the data region, then check out again
+    sheet = workbook['Template']
+    sheet.cell(row=5, column=6, value='Changed')
+    sheet.cell(row=900, column=3, value='Extra row')
+    _saved_members(workbook)
+
+    workbook = pool.checkout(TEMPLATE_FILE, 'Template', data_start_row=5)
+    sheet = workbook['Template']
+    assert sheet.cell(row=5, column=6).value == example_name
+    assert sheet.max_row == 7
+    assert _saved_members(workbook) == pristine
+
+
+def test_fill_matches_cell_writes():
+    """Test that a bulk fill saves the same workbook as writing cell by cell."""
+    rows = {5: {6: 'Bulk product', 84: ''}, 6: {83: 'Color'}, 9: {108: 7.99, 109: 12}}
+
+    pool = TemplatePool()
+    workbook = pool.checkout(TEMPLATE_FILE, 'Template', data_start_row=5)
+    for row, cells in rows.items():
+        for column, value in cells.items():
+            workbook['Template'].cell(row=row, column=column, value=value)
+    expected = _saved_members(workbook)
+
+    buffer = [[None] * 129 for _ in range(5)]
+    for row, cells in pool.base_values(TEMPLATE_FILE, 'Template', data_start_row=5).items():
+        for column, value in cells.items():
+            buffer[row - 5][column - 1] = value
+    for row, cells in rows.items():
+        for column, value in cells.items():
+            buffer[row - 5][column - 1] = value
+
+    workbook = pool.fill(TEMPLATE_FILE, buffer, 'Template', data_start_row=5)
+    assert _saved_members(workbook) == expected
@@ -0,0 +1,39 @@
+import os
+import tempfile
+
+from template_schema import TemplateSchema
+
+TEMPLATE_FILE = 'data/temu_template.xlsx'
+
+
+def test_schema_lookups():
+    """Test exact and substring column lookups against the real template."""
+    schema = TemplateSchema.from_template(TEMPLATE_FILE)
+
+    print("TEMPLATE SCHEMA TEST")
+    print("=" * 50)
+    print(f"Template columns: {schema.max_column}")
+
+    # Quantity appears twice in the template header row
+    quantity_cols = schema.find_all('Quantity')
+    assert len(quantity_cols) == 2
+    assert all(schema.headers[col - 1] == 'Quantity' for col in quantity_cols)
+
+    # Exact lookups only return identical headers, substring lookups return every container
+    assert schema.find('Category') == schema.headers.index('Category') + 1
+    assert schema.find('Images URL') is None
+    detail_cols = schema.find_all('Detail Images URL', exact=False)
+    assert detail_cols == [i for i, h in enumerate(schema.headers, 1) if 'Detail Images URL' in h]
+    assert schema.find('No Such Column', exact=False) is None
+
+
+def test_schema_disk_cache():
+    """Test that the schema is persisted and reloaded by template hash."""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        schema = TemplateSchema.load(TEMPLATE_FILE, cache_dir=cache_dir)
+        cache_file = os.path.join(cache_dir, f"{schema.template_hash}.json")
+        assert os.path.exists(cache_file)
+
+        cached = TemplateSchema.load(TEMPLATE_FILE, cache_dir=cache_dir)
+        assert cached.headers == schema.headers
+        assert cached.find_all('Quantity') == schema.find_all('Quantity')
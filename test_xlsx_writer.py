@@ -0,0 +1,53 @@
+import os
+import tempfile
+
+from openpyxl import load_workbook
+
+from template_pool import TemplatePool
+from xlsx_writer import TemplateXmlWriter
+
+TEMPLATE_FILE = 'data/temu_template.xlsx'
+
+SAMPLE_CELLS = [
+    (5, 6, 'Ladies Clear Crossbody Bag'),
+    (5, 8, 'HBG104955G'),
+    (5, 84, ''),                     # clears a template example value
+    (6, 83, 'Color'),                # string already in the shared strings table
+    (6, 84, ' Gold & Silver <2> '),  # needs escaping and space preservation
+    (7, 108, 7.99),
+    (8, 109, 12),
+    (1004, 5, '29153'),
+]
+
+
+def _sheet_values(path):
+    """Read every cell value of the Template sheet."""
+    workbook = load_workbook(path, read_only=True)
+    rows = [tuple(row) for row in workbook['Template'].iter_rows(values_only=True)]
+    workbook.close()
+    return rows
+
+
+def test_xml_engine_matches_openpyxl():
+    """Test that the XML writer produces the same cell values as the openpyxl path."""
+    with tempfile.TemporaryDirectory() as out_dir:
+        openpyxl_file = os.path.join(out_dir, 'openpyxl.xlsx')
+        xml_file = os.path.join(out_dir, 'xml.xlsx')
+
+        workbook = TemplatePool().checkout(TEMPLATE_FILE, 'Template', data_start_row=5)
+        for row, column, value in SAMPLE_CELLS:
+            workbook['Template'].cell(row=row, column=column, value=value)
+        workbook.save(openpyxl_file)
+
+        writer = TemplateXmlWriter(TEMPLATE_FILE, 'Template', data_start_row=5)
+        sheet = writer.new_sheet()
+        for row, column, value in SAMPLE_CELLS:
+            sheet.cell(row=row, column=column, value=value)
+        writer.save(sheet, xml_file)
+
+        assert _sheet_values(xml_file) == _sheet_values(openpyxl_file)
+
+        # Every other sheet is copied from the template untouched
+        xml_workbook = load_workbook(xml_file, read_only=True)
+        assert xml_workbook.sheetnames == load_workbook(TEMPLATE_FILE, read_only=True).sheetnames
+        xml_workbook.close()
@@ -0,0 +1,360 @@
+"""
+Direct XML Writer Module for Faire2Temu
+
+Writes Temu upload files without going through openpyxl's object model. The
+template archive is read once; for every chunk each untouched zip member
+(help sheets, data validations, styles, ...) is copied byte-for-byte and only
+the target sheet's XML and the shared strings table are regenerated.
+
+Rows above the data region (headers, reserved rows) are kept exactly as the
+template has them. Data rows are streamed from a RowBuffer, a 2-D buffer
+that starts out with the template's own data-row values so the result
+matches what the openpyxl engine produces cell for cell.
+
+Usage:
+    from xlsx_writer import TemplateXmlWriter
+
+    writer = TemplateXmlWriter('data/temu_template.xlsx', 'Template', data_start_row=5)
+    sheet = writer.new_sheet(row_count=len(names))
+    sheet.set_column(6, names)
+    writer.save(sheet, 'output/temu_template_other_1.xlsx')
+"""
+
+import numbers
+import posixpath
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+from typing import Any, Dict, List, Optional, Tuple
+
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.utils import column_index_from_string, get_column_letter
+from openpyxl.utils.exceptions import IllegalCharacterError
+
+MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+PKG_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+SHARED_STRINGS_TYPE = REL_NS + '/sharedStrings'
+
+ROW_START_RE = re.compile(r'<row\b[^>]*?\br="(\d+)"')
+ROW_RE = re.compile(r'<row\b([^>]*?)(/>|>(.*?)</row>)', re.S)
+CELL_RE = re.compile(r'<c\b([^>]*?)(/>|>(.*?)</c>)', re.S)
+ATTR_RE = re.compile(r'([\w:]+)="([^"]*)"')
+DIMENSION_RE = re.compile(r'<dimension ref="[^"]*"\s*/>')
+SST_COUNTS_RE = re.compile(r'<sst\b[^>]*>')
+
+
+def _escape(text: str) -> str:
+    """Escape text for use in XML character data."""
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _unescape(text: str) -> str:
+    """Undo XML character escaping for a raw attribute or text value."""
+    return (text.replace('&lt;', '<').replace('&gt;', '>').replace('&quot;', '"')
+            .replace('&apos;', "'").replace('&amp;', '&'))
+
+
+class RowBuffer:
+    """
+    Two-dimensional buffer holding the data region of one chunk's sheet.
+
+    ``values[i][j]`` is the value of sheet row ``data_start_row + i``, column
+    ``j + 1``. The buffer starts out with the template's own data-row values
+    and is filled a whole column at a time. Like openpyxl, a value of None
+    leaves the cell unchanged, while '' clears it.
+    """
+
+    def __init__(self, base_rows: Dict[int, Dict[int, Any]], data_start_row: int,
+                 max_column: int = 0, row_count: int = 0):
+        """
+        Start a buffer from the template's own data-row values.
+
+        Args:
+            base_rows: Template values keyed by row, then column
+            data_start_row: First row of the data region
+            max_column: Number of template columns each row holds
+            row_count: Number of data rows to allocate up front
+        """
+        self.data_start_row = data_start_row
+        self.max_column = max([max_column] + [max(cells, default=0) for cells in base_rows.values()])
+        self.values: List[List[Any]] = []
+        self._grow(max([row_count] + [row - data_start_row + 1 for row in base_rows]))
+        for row, cells in base_rows.items():
+            row_values = self.values[row - data_start_row]
+            for column, value in cells.items():
+                row_values[column - 1] = value
+
+    def _grow(self, row_count: int):
+        """Make sure the buffer holds at least ``row_count`` rows."""
+        while len(self.values) < row_count:
+            self.values.append([None] * self.max_column)
+
+    def cell(self, row: int, column: int, value: Any = None):
+        """Set the value of a single data cell (None leaves the cell unchanged)."""
+        if row < self.data_start_row:
+            raise ValueError(f"Row {row} is above the data region (starts at row {self.data_start_row})")
+        if value is None:
+            return
+        self._grow(row - self.data_start_row + 1)
+        row_values = self.values[row - self.data_start_row]
+        if column > len(row_values):
+            row_values.extend([None] * (column - len(row_values)))
+        row_values[column - 1] = value
+
+    def set_column(self, column: int, values: List[Any]):
+        """
+        Write values down one column, starting at the first data row.
+
+        Args:
+            column: Sheet column index (1-based)
+            values: One value per data row; None entries leave the cell unchanged
+        """
+        self._grow(len(values))
+        idx = column - 1
+        for row_values, value in zip(self.values, values):
+            if value is not None:
+                row_values[idx] = value
+
+    def set_block(self, columns: List[int], rows: List[List[Any]]):
+        """
+        Write a block of values into several columns, starting at the first data row.
+
+        Args:
+            columns: Sheet column indices (1-based) the block is written to
+            rows: One list of values per data row, aligned to ``columns``;
+                None entries leave the cell unchanged
+        """
+        self._grow(len(rows))
+        indices = [column - 1 for column in columns]
+        for row_values, block_values in zip(self.values, rows):
+            for idx, value in zip(indices, block_values):
+                if value is not None:
+                    row_values[idx] = value
+
+    def fill_column(self, column: int, value: Any, row_count: int):
+        """Write the same value into the first ``row_count`` data rows of a column."""
+        self.set_column(column, [value] * row_count)
+
+
+class TemplateXmlWriter:
+    """
+    Writes chunk files by patching a single sheet inside the template archive.
+
+    The template is read and indexed once when the writer is created; every
+    ``save`` only serializes the data rows and the extra shared strings.
+    """
+
+    def __init__(self, template_file: str, sheet_name: str = 'Template', data_start_row: int = 5):
+        """
+        Read the template archive and split the target sheet around its data rows.
+
+        Args:
+            template_file: Path to the template workbook (.xlsx)
+            sheet_name: Name of the sheet that receives the chunk data
+            data_start_row: First row of the data region
+        """
+        self.template_file = template_file
+        self.sheet_name = sheet_name
+        self.data_start_row = data_start_row
+
+        with zipfile.ZipFile(template_file) as archive:
+            self.members: List[Tuple[zipfile.ZipInfo, bytes]] = [
+                (info, archive.read(info.filename)) for info in archive.infolist()
+            ]
+        member_data = {info.filename: data for info, data in self.members}
+
+        self.sheet_path, self.shared_strings_path = self._locate_parts(member_data)
+        if self.shared_strings_path is None:
+            raise ValueError(f"{template_file} has no shared strings table")
+
+        self._load_shared_strings(member_data[self.shared_strings_path].decode('utf-8'))
+        self._load_sheet(member_data[self.sheet_path].decode('utf-8'))
+
+    def _locate_parts(self, member_data: Dict[str, bytes]) -> Tuple[str, Optional[str]]:
+        """Find the zip paths of the target sheet and the shared strings table."""
+        workbook = ET.fromstring(member_data['xl/workbook.xml'])
+        rels = ET.fromstring(member_data['xl/_rels/workbook.xml.rels'])
+        targets = {}
+        shared_strings_path = None
+        for rel in rels.iter(f'{{{PKG_REL_NS}}}Relationship'):
+            target = rel.get('Target')
+            path = target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join('xl', target))
+            targets[rel.get('Id')] = path
+            if rel.get('Type') == SHARED_STRINGS_TYPE:
+                shared_strings_path = path
+
+        for sheet in workbook.iter(f'{{{MAIN_NS}}}sheet'):
+            if sheet.get('name') == self.sheet_name:
+                return targets[sheet.get(f'{{{REL_NS}}}id')], shared_strings_path
+        raise KeyError(f"Worksheet {self.sheet_name} does not exist.")
+
+    def _load_shared_strings(self, sst_xml: str):
+        """Index the template's shared strings and keep the raw table for appending."""
+        self.shared_strings: List[str] = []
+        for item in ET.fromstring(sst_xml).iter(f'{{{MAIN_NS}}}si'):
+            # Rich text items keep their text in several runs
+            self.shared_strings.append(''.join(t.text or '' for t in item.iter(f'{{{MAIN_NS}}}t')))
+
+        self.string_index: Dict[str, int] = {}
+        for idx, text in enumerate(self.shared_strings):
+            self.string_index.setdefault(text, idx)
+
+        match = SST_COUNTS_RE.search(sst_xml)
+        count = re.search(r'\bcount="(\d+)"', match.group(0))
+        self.sst_tag_end = match.end()
+        self.sst_ref_count = int(count.group(1)) if count else len(self.shared_strings)
+        self.sst_xml = sst_xml
+
+    def _load_sheet(self, sheet_xml: str):
+        """Split the sheet XML into the fixed part before and after the data rows."""
+        sheet_xml = sheet_xml.replace('<sheetData/>', '<sheetData></sheetData>')
+        data_end = sheet_xml.index('</sheetData>')
+
+        data_begin = data_end
+        for match in ROW_START_RE.finditer(sheet_xml, 0, data_end):
+            if int(match.group(1)) >= self.data_start_row:
+                data_begin = match.start()
+                break
+
+        self.sheet_head = sheet_xml[:data_begin]
+        self.sheet_tail = sheet_xml[data_end:]
+
+        # Template data rows: row attributes, cell styles and cell values
+        self.base_row_attrs: Dict[int, str] = {}
+        self.base_styles: Dict[int, Dict[int, str]] = {}
+        self.base_values: Dict[int, Dict[int, Any]] = {}
+        self.base_string_refs = 0
+        for row_match in ROW_RE.finditer(sheet_xml, data_begin, data_end):
+            attrs = dict(ATTR_RE.findall(row_match.group(1)))
+            row = int(attrs.pop('r'))
+            attrs.pop('spans', None)  # spans no longer hold once columns are added
+            self.base_row_attrs[row] = ''.join(f' {key}="{value}"' for key, value in attrs.items())
+            self.base_styles[row] = {}
+            self.base_values[row] = {}
+            for cell_match in CELL_RE.finditer(row_match.group(3) or ''):
+                self._load_base_cell(row, cell_match)
+
+        last_column = 1
+        dimension = DIMENSION_RE.search(self.sheet_head)
+        if dimension:
+            ref = re.search(r'ref="(?:[A-Z]+\d+:)?([A-Z]+)\d+"', dimension.group(0))
+            if ref:
+                last_column = column_index_from_string(ref.group(1))
+        self.last_column = last_column
+
+    def _load_base_cell(self, row: int, cell_match):
+        """Record the style and value of one template data-row cell."""
+        attrs = dict(ATTR_RE.findall(cell_match.group(1)))
+        column = column_index_from_string(re.match(r'[A-Z]+', attrs['r']).group(0))
+        if 's' in attrs:
+            self.base_styles[row][column] = attrs['s']
+
+        body = cell_match.group(3) or ''
+        cell_type = attrs.get('t', 'n')
+        if cell_type == 'inlineStr':
+            text = ''.join(re.findall(r'<t\b[^>]*>(.*?)</t>', body, re.S))
+            self.base_values[row][column] = _unescape(text)
+            return
+
+        raw = re.search(r'<v>(.*?)</v>', body, re.S)
+        if raw is None:
+            return
+        raw = _unescape(raw.group(1))
+        if cell_type == 's':
+            self.base_values[row][column] = self.shared_strings[int(raw)]
+            self.base_string_refs += 1
+        elif cell_type == 'b':
+            self.base_values[row][column] = raw == '1'
+        elif cell_type in ('str', 'e'):
+            self.base_values[row][column] = raw
+        else:
+            # Same rule openpyxl uses when reading numbers
+            self.base_values[row][column] = float(raw) if '.' in raw or 'E' in raw.upper() else int(raw)
+
+    def new_sheet(self, row_count: int = 0) -> RowBuffer:
+        """Get an empty chunk buffer holding the template's data-row values."""
+        return RowBuffer(self.base_values, self.data_start_row, self.last_column, row_count)
+
+    def save(self, sheet: RowBuffer, output_file: str):
+        """
+        Write a chunk file: the template with the buffer's rows as data region.
+
+        Args:
+            sheet: Buffer with the chunk's data rows
+            output_file: Path of the .xlsx file to create
+        """
+        new_strings: List[str] = []
+        new_string_index: Dict[str, int] = {}
+        string_refs = 0
+        max_row = self.data_start_row - 1
+        max_column = self.last_column
+
+        row_parts = []
+        last_buffer_row = sheet.data_start_row + len(sheet.values) - 1
+        for row in sorted(set(range(sheet.data_start_row, last_buffer_row + 1)) | set(self.base_row_attrs)):
+            idx = row - sheet.data_start_row
+            values = sheet.values[idx] if 0 <= idx < len(sheet.values) else []
+            styles = self.base_styles.get(row, {})
+            cells = []
+            for column in sorted({column for column, value in enumerate(values, 1) if value is not None} | set(styles)):
+                value = values[column - 1] if column <= len(values) else None
+                style = styles.get(column)
+                ref = f'{get_column_letter(column)}{row}'
+                style_attr = f' s="{style}"' if style is not None else ''
+
+                if value is None or value == '':
+                    if style is None:
+                        continue
+                    cells.append(f'<c r="{ref}"{style_attr}/>')
+                elif isinstance(value, bool):
+                    cells.append(f'<c r="{ref}"{style_attr} t="b"><v>{int(value)}</v></c>')
+                elif isinstance(value, numbers.Number):
+                    number = repr(float(value)) if isinstance(value, float) or not isinstance(value, numbers.Integral) else str(int(value))
+                    cells.append(f'<c r="{ref}"{style_attr}><v>{number}</v></c>')
+                else:
+                    text = str(value)
+                    idx = self.string_index.get(text)
+                    if idx is None:
+                        idx = new_string_index.get(text)
+                        if idx is None:
+                            if ILLEGAL_CHARACTERS_RE.search(text):
+                                raise IllegalCharacterError(f"{text} cannot be used in worksheets.")
+                            idx = len(self.shared_strings) + len(new_strings)
+                            new_string_index[text] = idx
+                            new_strings.append(text)
+                    string_refs += 1
+                    cells.append(f'<c r="{ref}"{style_attr} t="s"><v>{idx}</v></c>')
+                max_column = max(max_column, column)
+
+            if cells or row in self.base_row_attrs:
+                row_parts.append(f'<row r="{row}"{self.base_row_attrs.get(row, "")}>{"".join(cells)}</row>')
+                max_row = max(max_row, row)
+
+        sheet_xml = self.sheet_head + ''.join(row_parts) + self.sheet_tail
+        sheet_xml = DIMENSION_RE.sub(f'<dimension ref="A1:{get_column_letter(max_column)}{max_row}"/>', sheet_xml, count=1)
+
+        with zipfile.ZipFile(output_file, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for info, data in self.members:
+                if info.filename == self.sheet_path:
+                    data = sheet_xml.encode('utf-8')
+                elif info.filename == self.shared_strings_path:
+                    data = self._shared_strings_xml(new_strings, string_refs).encode('utf-8')
+                archive.writestr(info, data)
+
+    def _shared_strings_xml(self, new_strings: List[str], string_refs: int) -> str:
+        """Build the shared strings table with the chunk's new strings appended."""
+        count = self.sst_ref_count - self.base_string_refs + string_refs
+        unique_count = len(self.shared_strings) + len(new_strings)
+        tag = self.sst_xml[:self.sst_tag_end]
+        tag = re.sub(r'\bcount="\d+"', f'count="{count}"', tag)
+        tag = re.sub(r'\buniqueCount="\d+"', f'uniqueCount="{unique_count}"', tag)
+
+        items = []
+        for text in new_strings:
+            space = ' xml:space="preserve"' if text != text.strip() else ''
+            items.append(f'<si><t{space}>{_escape(text)}</t></si>')
+
+        body = self.sst_xml[self.sst_tag_end:]
+        close = body.rindex('</sst>')
+        return tag + body[:close] + ''.join(items) + body[close:]